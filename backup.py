@@ -1,6 +1,6 @@
 """Comprehensive database backup and migration safety module.
 
-Provides checksum-verified backups, test-migration-on-copy, and
+Provides integrity-verified backups, test-migration-on-copy, and
 post-migration row-count validation.  NO migration may touch the live
 database until a verified backup exists and a trial run on a copy has
 passed integrity checks.
@@ -11,29 +11,40 @@ untouched.
 
 from __future__ import annotations
 
-import hashlib
+import os
 import re as _re_module
 import shutil
 import sqlite3
 import string
 import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Optional
 
 
-# ── Checksum helpers ──────────────────────────────────────────────
+# ── File copy ─────────────────────────────────────────────────────
 
-def sha256_file(path: Path) -> str:
-    """Return the hex SHA-256 digest of a file."""
-    h = hashlib.sha256()
-    with open(path, "rb") as f:
-        while True:
-            chunk = f.read(65536)
-            if not chunk:
-                break
-            h.update(chunk)
-    return h.hexdigest()
+def _fast_copy(src: Path, dst: Path) -> None:
+    """Copy *src* to *dst* like ``shutil.copy2``, letting the kernel move the bytes.
+
+    Uses ``os.copy_file_range`` where available, which never bounces data
+    through user space and becomes a metadata-only reflink on CoW
+    filesystems (btrfs, XFS).  Falls back to ``shutil.copy2`` when the
+    syscall is missing or refused (old kernel, cross-device, etc.).
+    """
+    copy_file_range = getattr(os, "copy_file_range", None)
+    if copy_file_range is not None:
+        try:
+            with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+                while copy_file_range(fsrc.fileno(), fdst.fileno(), 1 << 30) > 0:
+                    pass
+            shutil.copystat(src, dst)
+            return
+        except OSError:
+            pass
+    shutil.copy2(src, dst)
 
 
 # ── Row-count snapshot ────────────────────────────────────────────
@@ -43,21 +54,38 @@ def table_row_counts(conn: sqlite3.Connection) -> dict[str, int]:
     tables = conn.execute(
         "SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%'"
     ).fetchall()
-    counts: dict[str, int] = {}
-    for row in tables:
-        name = row[0] if isinstance(row, (list, tuple)) else row["name"]
-        count = conn.execute(f'SELECT COUNT(*) FROM "{name}"').fetchone()[0]
-        counts[name] = count
-    return counts
+    names = [row[0] for row in tables]
+    if not names:
+        return {}
+    # One statement for all tables instead of one COUNT(*) round-trip each.
+    sql = " UNION ALL ".join(
+        'SELECT {}, COUNT(*) FROM "{}"'.format(i, name.replace('"', '""'))
+        for i, name in enumerate(names)
+    )
+    return {names[i]: count for i, count in conn.execute(sql).fetchall()}
+
+
+def _snapshot_row_counts(db_path: Path) -> dict[str, int]:
+    """Return table_row_counts for *db_path* via a short-lived connection."""
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        _tune_connection(conn, wal=False)
+        return table_row_counts(conn)
+    finally:
+        conn.close()
 
 
 # ── Verified backup ───────────────────────────────────────────────
 
 def create_verified_backup(db_path: Path) -> Path:
-    """Create a backup copy and verify its checksum matches the live DB.
+    """Create a backup snapshot and verify it passes an integrity check.
+
+    The snapshot is taken with SQLite's Online Backup API, so it is
+    transactionally consistent even while other connections are writing
+    and includes committed pages that are still in the WAL.
 
     Returns the backup path on success.
-    Raises RuntimeError if the backup does not match.
+    Raises RuntimeError if the snapshot fails or is not a sound database.
     """
     if not db_path.exists():
         raise RuntimeError(f"Database file does not exist: {db_path}")
@@ -68,34 +96,81 @@ def create_verified_backup(db_path: Path) -> Path:
     date_str = datetime.now().strftime("%y%m%d")
     base = f"{db_path.name}.{date_str}"
 
+    # One directory read instead of an exists() call per letter.
+    with os.scandir(backup_dir) as it:
+        existing = {entry.name for entry in it if entry.name.startswith(base)}
+
     backup_path: Optional[Path] = None
     for letter in string.ascii_lowercase:
-        candidate = backup_dir / f"{base}{letter}"
-        if not candidate.exists():
-            backup_path = candidate
+        name = f"{base}{letter}"
+        if name not in existing:
+            backup_path = backup_dir / name
             break
 
     if backup_path is None:
-        raise RuntimeError(f"Exhausted backup slots for {base}[a-z]")
+        # All 26 letters used today: fall back to a nanosecond-clock
+        # suffix rather than refusing to back up (and so to migrate).
+        backup_path = backup_dir / f"{base}-{time.time_ns():x}"
 
-    # Take the checksum of the live DB BEFORE copying.
-    live_hash = sha256_file(db_path)
+    try:
+        # Snapshot the live DB page-by-page under a read transaction.
+        src = sqlite3.connect(db_path)
+        try:
+            dst = sqlite3.connect(backup_path)
+            try:
+                src.backup(dst)
+                # Keep the backup a single self-contained file.
+                dst.execute("PRAGMA journal_mode=DELETE")
+            finally:
+                dst.close()
+        finally:
+            src.close()
 
-    # Copy the database file.
-    shutil.copy2(db_path, backup_path)
+        # Verify the snapshot before trusting it.
+        check_conn = sqlite3.connect(backup_path)
+        try:
+            result = check_conn.execute("PRAGMA integrity_check").fetchone()[0]
+        finally:
+            check_conn.close()
+    except sqlite3.Error as exc:
+        backup_path.unlink(missing_ok=True)
+        raise RuntimeError(f"Backup of {db_path} FAILED: {exc}") from exc
 
-    # Verify the copy matches.
-    backup_hash = sha256_file(backup_path)
-    if backup_hash != live_hash:
+    if result != "ok":
         # Delete the bad backup — it cannot be trusted.
         backup_path.unlink(missing_ok=True)
-        raise RuntimeError(
-            f"Backup checksum mismatch!  live={live_hash}  backup={backup_hash}"
-        )
+        raise RuntimeError(f"Backup integrity check failed: {result}")
+
+    # Make sure the backup and its directory entry survive a crash
+    # before the caller goes on to touch the live DB.
+    _fsync_durable(backup_path)
 
     return backup_path
 
 
+def _fsync_durable(path: Path) -> None:
+    """fsync *path* and its parent directory.
+
+    Directory fsync is best-effort: platforms without ``O_DIRECTORY``
+    (Windows) cannot open a directory for syncing.
+    """
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+    try:
+        dir_fd = os.open(path.parent, os.O_RDONLY | os.O_DIRECTORY)
+    except (AttributeError, OSError):
+        return
+    try:
+        os.fsync(dir_fd)
+    except OSError:
+        pass
+    finally:
+        os.close(dir_fd)
+
+
 # ── Daily auto-backup ────────────────────────────────────────────
 
 def ensure_daily_backup(db_path: Path, enabled: bool = True) -> Optional[Path]:
@@ -123,8 +198,9 @@ def ensure_daily_backup(db_path: Path, enabled: bool = True) -> Optional[Path]:
 def prune_old_backups(db_path: Path, retain_days: int = 7) -> list[Path]:
     """Delete backups older than *retain_days*.
 
-    Scans `.backups/` for files matching `plan.db.YYMMDD[a-z]`,
-    parses the date, and removes any that are too old.
+    Scans `.backups/` for files matching `plan.db.YYMMDD[a-z]` (or the
+    `plan.db.YYMMDD-<hex>` overflow names), parses the date, and removes
+    any that are too old.
 
     Returns the list of deleted paths.
     """
@@ -135,7 +211,7 @@ def prune_old_backups(db_path: Path, retain_days: int = 7) -> list[Path]:
     cutoff = datetime.now() - timedelta(days=retain_days)
     deleted: list[Path] = []
     pattern = _re_module.compile(
-        r"^" + _re_module.escape(db_path.name) + r"\.(\d{6})[a-z]$"
+        r"^" + _re_module.escape(db_path.name) + r"\.(\d{6})(?:[a-z]|-[0-9a-f]+)$"
     )
 
     for entry in backup_dir.iterdir():
@@ -155,39 +231,131 @@ def prune_old_backups(db_path: Path, retain_days: int = 7) -> list[Path]:
 
 # ── Trial migration on a copy ────────────────────────────────────
 
+_PATCH_RE = _re_module.compile(r"patch-(\d+)\.sql")
+
+
 class MigrationAborted(Exception):
     """Raised when a migration fails validation and is aborted."""
 
 
+def _tune_connection(conn: sqlite3.Connection, *, wal: bool = True) -> None:
+    """Apply migration-friendly PRAGMAs to a freshly opened connection.
+
+    WAL keeps readers unblocked while patches run, synchronous=NORMAL
+    defers fsyncs to checkpoints, and the cache/mmap sizes let row counts
+    and patch scripts work from memory instead of repeated reads.
+
+    Pass ``wal=False`` for read-only snapshots: switching the journal
+    mode rewrites the file header, and the live DB must stay untouched
+    until the trial migration has passed.
+    """
+    if wal:
+        conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(
+        "PRAGMA synchronous=NORMAL;"
+        "PRAGMA temp_store=MEMORY;"
+        "PRAGMA cache_size=-65536;"
+        "PRAGMA mmap_size=268435456;"
+        "PRAGMA busy_timeout=5000;"
+    )
+
+
+# Databases up to this size are cloned into RAM for the trial migration;
+# larger ones go through a temp file so the trial cannot exhaust memory.
+_IN_MEMORY_TRIAL_MAX_BYTES = 512 * 1024 * 1024
+
+
+def _open_trial_copy(db_path: Path) -> tuple[sqlite3.Connection, Optional[Path]]:
+    """Open a private copy of *db_path* to run a trial migration against.
+
+    Returns ``(conn, tmp_path)``.  Small databases are cloned into a
+    ``:memory:`` database with the Online Backup API and ``tmp_path`` is
+    None; larger ones are copied to a temp file, which the caller must
+    delete after closing the connection.
+    """
+    if db_path.stat().st_size <= _IN_MEMORY_TRIAL_MAX_BYTES:
+        conn = sqlite3.connect(":memory:", isolation_level=None)
+        try:
+            src = sqlite3.connect(db_path)
+            try:
+                src.backup(conn)
+            finally:
+                src.close()
+        except BaseException:
+            conn.close()
+            raise
+        return conn, None
+
+    tmp_fd, tmp_name = tempfile.mkstemp(suffix=".db", prefix="plan_migrate_")
+    os.close(tmp_fd)
+    tmp_path = Path(tmp_name)
+    try:
+        _fast_copy(db_path, tmp_path)
+        conn = sqlite3.connect(tmp_path, isolation_level=None)
+        _tune_connection(conn)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    return conn, tmp_path
+
+
+def _load_patches(patches_dir: Path, current_version: int,
+                  latest_version: int) -> list[tuple[int, str]]:
+    """Read the pending schema patches as ``(version, sql)`` in order.
+
+    Only patches with ``current_version < version <= latest_version``
+    are returned, so the list can be applied to the trial copy and then
+    to the live DB without scanning or reading the files twice.
+    """
+    patches = sorted(
+        (int(m.group(1)), path)
+        for path in patches_dir.glob("patch-*.sql")
+        if (m := _PATCH_RE.match(path.name))
+    )
+    return [
+        (version, path.read_text(encoding="utf-8"))
+        for version, path in patches
+        if current_version < version <= latest_version
+    ]
+
+
 def _apply_patches_to(conn: sqlite3.Connection, current_version: int,
-                      latest_version: int, patches_dir: Path) -> int:
-    """Apply schema patches to a connection.  Returns the final version."""
-    import re as _re
-
-    patches = []
-    for path in patches_dir.glob("patch-*.sql"):
-        match = _re.match(r"patch-(\d+)\.sql", path.name)
-        if not match:
-            continue
-        patches.append((int(match.group(1)), path))
+                      patches: list[tuple[int, str]]) -> int:
+    """Apply patches from _load_patches() to a connection.  Returns the final version.
 
-    for version, path in sorted(patches):
-        if version <= current_version:
-            continue
-        if version > latest_version:
-            continue
-        conn.execute("PRAGMA foreign_keys = OFF")
-        conn.executescript(path.read_text(encoding="utf-8"))
-        conn.execute("PRAGMA foreign_keys = ON")
-        # Update schema_version in the copy.
+    All patches run inside one IMMEDIATE transaction, so the migration
+    commits (and fsyncs) once and a failing patch rolls back every patch
+    before it instead of leaving a half-migrated schema.
+    """
+    if not patches:
+        return current_version
+
+    # executescript() commits any open transaction before it starts, so
+    # BEGIN has to be part of the script itself.  The trailing ';' closes
+    # a patch whose last statement has no terminator.
+    script = "BEGIN IMMEDIATE;\n" + "".join(sql + "\n;\n" for _version, sql in patches)
+    final_version = patches[-1][0]
+
+    # Disable FK checks for migrations that recreate tables.  The pragma
+    # is a no-op inside a transaction, so it brackets the whole batch.
+    conn.execute("PRAGMA foreign_keys = OFF")
+    try:
+        conn.executescript(script)
+        # Update schema_version in the same transaction.
         conn.execute(
             "INSERT OR REPLACE INTO schema_version (id, version, updated_at) "
             "VALUES (1, ?, ?)",
-            (version, datetime.now().isoformat()),
+            (final_version, datetime.now().isoformat()),
         )
-        current_version = version
+        conn.execute("COMMIT")
+    except Exception:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.execute("PRAGMA foreign_keys = ON")
 
-    return current_version
+    return final_version
 
 
 def validate_row_counts(before: dict[str, int], after: dict[str, int]) -> list[str]:
@@ -226,8 +394,10 @@ def safe_migrate(db_path: Path, current_version: int,
     Pipeline:
         1. Create a verified backup of the live DB.
         2. Snapshot row counts from the live DB.
-        3. Copy live DB to a temporary file.
-        4. Apply patches to the temporary copy.
+        3. Clone the live DB for a trial run (concurrently with step 2):
+           in memory, or to a temp file if it exceeds
+           _IN_MEMORY_TRIAL_MAX_BYTES.
+        4. Apply patches to the trial copy.
         5. Validate that the copy did not lose data (row counts).
         6. Apply patches to the live DB.
         7. Validate the live DB did not lose data.
@@ -249,41 +419,32 @@ def safe_migrate(db_path: Path, current_version: int,
     # ── Step 1: Verified backup ──
     backup_path = create_verified_backup(db_path)
 
-    # ── Step 2: Snapshot row counts from live DB ──
-    live_conn = sqlite3.connect(db_path, isolation_level=None)
-    live_conn.row_factory = sqlite3.Row
-    try:
-        pre_counts = table_row_counts(live_conn)
-    finally:
-        live_conn.close()
+    # Shared by the trial and live runs (steps 4 and 6).
+    patches = _load_patches(patches_dir, current_version, latest_version)
 
-    # ── Step 3: Copy to temp file for trial run ──
-    tmp_fd = None
-    tmp_path = None
+    tmp_conn: Optional[sqlite3.Connection] = None
+    tmp_path: Optional[Path] = None
     try:
-        tmp_fd, tmp_name = tempfile.mkstemp(suffix=".db", prefix="plan_migrate_")
-        tmp_path = Path(tmp_name)
-        import os
-        os.close(tmp_fd)
-        tmp_fd = None
-        shutil.copy2(db_path, tmp_path)
-
-        # ── Step 4: Apply patches to temp copy ──
-        tmp_conn = sqlite3.connect(tmp_path, isolation_level=None)
-        tmp_conn.row_factory = sqlite3.Row
+        # ── Steps 2+3: Snapshot live row counts while cloning the DB ──
+        # Both are read-only on the live DB and spend their time in C
+        # (SQLite's backup API / the copy syscall) with the GIL released,
+        # so they overlap.
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            counts_future = pool.submit(_snapshot_row_counts, db_path)
+            tmp_conn, tmp_path = _open_trial_copy(db_path)
+            pre_counts = counts_future.result()
+
+        # ── Step 4: Apply patches to the trial copy ──
         try:
-            try:
-                _apply_patches_to(tmp_conn, current_version, latest_version, patches_dir)
-            except sqlite3.Error as sql_err:
-                raise MigrationAborted(
-                    f"Trial migration FAILED — SQL error on copy: {sql_err}. "
-                    f"Live database NOT touched.  Backup at: {backup_path}"
-                ) from sql_err
-
-            # ── Step 5: Validate temp copy ──
-            post_counts = table_row_counts(tmp_conn)
-        finally:
-            tmp_conn.close()
+            _apply_patches_to(tmp_conn, current_version, patches)
+        except sqlite3.Error as sql_err:
+            raise MigrationAborted(
+                f"Trial migration FAILED — SQL error on copy: {sql_err}. "
+                f"Live database NOT touched.  Backup at: {backup_path}"
+            ) from sql_err
+
+        # ── Step 5: Validate the trial copy ──
+        post_counts = table_row_counts(tmp_conn)
 
         errors = validate_row_counts(pre_counts, post_counts)
         if errors:
@@ -294,17 +455,17 @@ def safe_migrate(db_path: Path, current_version: int,
             )
 
     finally:
-        # Clean up temp file.
+        if tmp_conn is not None:
+            tmp_conn.close()
+        # Clean up the temp file, if the trial ran on disk.
         if tmp_path and tmp_path.exists():
             tmp_path.unlink(missing_ok=True)
 
     # ── Step 6: Apply patches to the live DB ──
     live_conn = sqlite3.connect(db_path, isolation_level=None)
-    live_conn.row_factory = sqlite3.Row
+    _tune_connection(live_conn)
     try:
-        final_version = _apply_patches_to(
-            live_conn, current_version, latest_version, patches_dir
-        )
+        final_version = _apply_patches_to(live_conn, current_version, patches)
 
         # ── Step 7: Validate live DB ──
         post_live_counts = table_row_counts(live_conn)
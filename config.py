@@ -2,29 +2,38 @@
 
 from __future__ import annotations
 
+from collections.abc import Mapping
+from functools import lru_cache
 from pathlib import Path
+from types import MappingProxyType
 from typing import Any
 
 import yaml
 
+try:  # libyaml-backed parser/emitter when PyYAML was built with it
+    from yaml import CSafeDumper as _SafeDumper, CSafeLoader as _SafeLoader
+except ImportError:  # pure-Python fallback
+    from yaml import SafeDumper as _SafeDumper, SafeLoader as _SafeLoader
+
 
 _MODULE_DIR = Path(__file__).resolve().parent
 
-DEFAULTS: dict[str, Any] = {
-    "workflow": {
+# Read-only so that no caller can mutate the defaults behind get_config().
+DEFAULTS: Mapping[str, Mapping[str, Any]] = MappingProxyType({
+    "workflow": MappingProxyType({
         "require_goal_and_plan": True,
         "allow_reopen_completed": False,
         "daily_backup": True,
         "backup_retain_days": 7,
         "enable_steps": True,
-    },
-    "web": {
+    }),
+    "web": MappingProxyType({
         "key": "",
-    },
-    "attachments": {
+    }),
+    "attachments": MappingProxyType({
         "inline_lines": 100,
-    },
-}
+    }),
+})
 
 STEP_TOOLS: frozenset[str] = frozenset({
     "plan_step_switch", "plan_step_show", "plan_step_list",
@@ -37,8 +46,14 @@ STEP_TOOLS: frozenset[str] = frozenset({
 def disabled_tools() -> frozenset[str]:
     """Return tool names that should be disabled based on config toggles."""
     cfg = get_config().get("workflow", {})
+    return _disabled_for(bool(cfg.get("enable_steps", True)))
+
+
+@lru_cache(maxsize=None)
+def _disabled_for(enable_steps: bool) -> frozenset[str]:
+    """Build the disabled-tool set for one combination of toggles."""
     result: set[str] = set()
-    if not cfg.get("enable_steps", True):
+    if not enable_steps:
         result |= STEP_TOOLS
     return frozenset(result)
 
@@ -56,18 +71,21 @@ def check_web_key(provided: str | None) -> bool:
     return provided == configured
 
 
-def _deep_merge(defaults: dict, overrides: dict) -> dict:
-    """Merge overrides into defaults recursively. Only known keys are kept."""
+def _deep_merge(defaults: Mapping, overrides: dict) -> dict:
+    """Merge overrides into defaults recursively. Only known keys are kept.
+
+    The result is built from plain dicts so it can be serialized as-is.
+    """
     result = {}
     for key, default_val in defaults.items():
         if key in overrides:
             override_val = overrides[key]
-            if isinstance(default_val, dict) and isinstance(override_val, dict):
+            if isinstance(default_val, Mapping) and isinstance(override_val, dict):
                 result[key] = _deep_merge(default_val, override_val)
             else:
                 result[key] = override_val
         else:
-            result[key] = default_val if not isinstance(default_val, dict) else dict(default_val)
+            result[key] = dict(default_val) if isinstance(default_val, Mapping) else default_val
     return result
 
 
@@ -76,17 +94,51 @@ def config_path() -> Path:
     return _MODULE_DIR / "config.yaml"
 
 
+# (path, mtime_ns, size) of config.yaml -> merged config; the stat fields
+# are None when there is no file.
+_cache: tuple[tuple[str, int | None, int | None], dict[str, Any]] | None = None
+
+
 def get_config() -> dict[str, Any]:
-    """Load config.yaml and merge with defaults. Missing file or keys use defaults."""
+    """Load config.yaml and merge with defaults. Missing file or keys use defaults.
+
+    The merged result is cached and only re-parsed when the file's
+    path, mtime or size changes, so repeated calls cost a single stat().
+    Callers must treat the returned dict as read-only.
+    """
+    global _cache
     path = config_path()
-    if path.exists():
-        try:
-            with open(path) as f:
-                user_cfg = yaml.safe_load(f)
-            if isinstance(user_cfg, dict):
-                return _deep_merge(DEFAULTS, user_cfg)
-        except (yaml.YAMLError, OSError):
-            pass  # malformed or unreadable — fall back to defaults
+    try:
+        st = path.stat()
+        key = (str(path), st.st_mtime_ns, st.st_size)
+    except OSError:
+        key = (str(path), None, None)
+    if _cache is not None and _cache[0] == key:
+        return _cache[1]
+    cfg = _load_config(path) if key[1] is not None else _deep_merge(DEFAULTS, {})
+    _cache = (key, cfg)
+    return cfg
+
+
+def _cache_clear() -> None:
+    """Drop the cached config so the next get_config() re-reads the file."""
+    global _cache
+    _cache = None
+
+
+# Same spelling as functools.lru_cache, for tests and explicit reloads.
+get_config.cache_clear = _cache_clear  # type: ignore[attr-defined]
+
+
+def _load_config(path: Path) -> dict[str, Any]:
+    """Parse config.yaml at *path* and merge it over the defaults."""
+    try:
+        with open(path) as f:
+            user_cfg = yaml.load(f, Loader=_SafeLoader)
+        if isinstance(user_cfg, dict):
+            return _deep_merge(DEFAULTS, user_cfg)
+    except (yaml.YAMLError, OSError):
+        pass  # malformed or unreadable — fall back to defaults
     return _deep_merge(DEFAULTS, {})
 
 
@@ -97,7 +149,7 @@ def set_config(section: str, key: str, value: Any) -> dict[str, Any]:
     if path.exists():
         try:
             with open(path) as f:
-                loaded = yaml.safe_load(f)
+                loaded = yaml.load(f, Loader=_SafeLoader)
             if isinstance(loaded, dict):
                 file_cfg = loaded
         except (yaml.YAMLError, OSError):
@@ -106,5 +158,6 @@ def set_config(section: str, key: str, value: Any) -> dict[str, Any]:
         file_cfg[section] = {}
     file_cfg[section][key] = value
     with open(path, "w") as f:
-        yaml.safe_dump(file_cfg, f, default_flow_style=False)
+        yaml.dump(file_cfg, f, Dumper=_SafeDumper, default_flow_style=False)
+    _cache_clear()
     return get_config()
@@ -3,10 +3,11 @@
 from __future__ import annotations
 
 import json
+import os
 from dataclasses import dataclass
 from typing import Iterable, Optional
 
-from . import db
+from . import config, db
 
 STATUS_PLANNED = "planned"
 STATUS_STARTED = "started"
@@ -24,43 +25,72 @@ class TaskInput:
 
 
 def resolve_context_id(conn, context_ref: str | int, project_id: int | None = None) -> int:
-    """Resolve a context reference to an integer ID, optionally scoped to a project."""
+    """Resolve a context reference to an integer ID, optionally scoped to a project.
+
+    Hits are remembered on connections from db.connect (see
+    db.PlanConnection), so repeat lookups within one command are free.
+    """
+    cache = getattr(conn, "context_ids", None)
+    # Keyed on the ref as given: an int ref matches ids only, while the
+    # same digits as a string may also match a context name.
+    key = (context_ref, project_id)
+    if cache is not None and key in cache:
+        return cache[key]
+    context_id, _status = _lookup_context(conn, context_ref, project_id)
+    if cache is not None:
+        cache[key] = context_id
+    return context_id
+
+
+def resolve_context_id_with_status(
+    conn, context_ref: str | int, project_id: int | None = None,
+) -> tuple[int, str]:
+    """Like resolve_context_id, but also return the context's current status.
+
+    Status can change within a command, so this always queries (and
+    refreshes the id cache while it is at it).
+    """
+    context_id, status = _lookup_context(conn, context_ref, project_id)
+    cache = getattr(conn, "context_ids", None)
+    if cache is not None:
+        cache[(context_ref, project_id)] = context_id
+    return context_id, status
+
+
+def _lookup_context(conn, context_ref: str | int, project_id: int | None) -> tuple[int, str]:
     if isinstance(context_ref, int):
         row = conn.execute(
-            "SELECT id FROM contexts WHERE id = ?",
+            "SELECT id, status FROM contexts WHERE id = ?",
             (context_ref,),
         ).fetchone()
         if row:
-            return int(row["id"])
+            return int(row[0]), row[1]
         raise ValueError(f"Context id {context_ref} not found.")
 
-    try:
-        context_id = int(str(context_ref))
-    except ValueError:
-        context_id = None
+    # Plain digit check instead of int() in a try/except: name refs are
+    # the common case and should not pay for raising ValueError.
+    ref = str(context_ref)
+    context_id = int(ref) if ref.removeprefix("-").isdecimal() else None
 
-    if context_id is not None:
-        row = conn.execute(
-            "SELECT id FROM contexts WHERE id = ?",
-            (context_id,),
-        ).fetchone()
-        if row:
-            return int(row["id"])
-
-    # Name lookup: scope to project if provided.
+    # One query for both lookups: an id match (numeric refs only) wins
+    # over a name match.  The project filter is spelled out rather than
+    # "? IS NULL OR ...", which would stop SQLite using the
+    # (project_id, name) index.
     if project_id is not None:
         row = conn.execute(
-            "SELECT id FROM contexts WHERE name = ? AND project_id = ?",
-            (str(context_ref), project_id),
+            "SELECT id, status FROM contexts WHERE id = ? OR (project_id = ? AND name = ?) "
+            "ORDER BY id = ? DESC LIMIT 1",
+            (context_id, project_id, str(context_ref), context_id),
         ).fetchone()
     else:
         row = conn.execute(
-            "SELECT id FROM contexts WHERE name = ?",
-            (str(context_ref),),
+            "SELECT id, status FROM contexts WHERE id = ? OR name = ? "
+            "ORDER BY id = ? DESC LIMIT 1",
+            (context_id, str(context_ref), context_id),
         ).fetchone()
     if not row:
         raise ValueError(f"Context '{context_ref}' not found.")
-    return int(row["id"])
+    return int(row[0]), row[1]
 
 
 def resolve_active_context_id(conn, user_id: int | None = None, project_id: int | None = None) -> int:
@@ -88,6 +118,56 @@ def _next_step_payload(
     return json.dumps(payload)
 
 
+# Both next-step payloads are fixed apart from the active task number, so
+# they are serialized once here; only the number is formatted per call.
+_ACTIVE_TASK_NEXT_STEP_HEAD, _, _ACTIVE_TASK_NEXT_STEP_TAIL = _next_step_payload(
+    action="task.done",
+    reason="Active task in progress.",
+    allowed=[
+        "task.done",
+        "task.switch",
+        "task.new",
+        "task.show",
+        "task.status",
+        "task.logs",
+        "task.list",
+        "plan.show",
+        "plan.status",
+        "plan.logs",
+        "context.show",
+        "context.status",
+        "context.logs",
+        "context.list",
+        "context.switch",
+    ],
+    target={"task_number": 0},
+).rpartition("0")
+
+_NEW_TASK_NEXT_STEP = _next_step_payload(
+    action="task.new",
+    reason="No active task is set.",
+    allowed=[
+        "task.new",
+        "plan.show",
+        "plan.status",
+        "context.show",
+        "context.status",
+        "context.logs",
+        "context.list",
+        "context.switch",
+    ],
+)
+
+
+def _set_active_task(conn, context_id: int, task_id: int, event: str, now: str) -> None:
+    """Record *task_id* as the context's active and last task."""
+    conn.execute(
+        "UPDATE context_state SET active_task_id = ?, last_task_id = ?, "
+        "last_event = ?, updated_at = ? WHERE context_id = ?",
+        (task_id, task_id, event, now, context_id),
+    )
+
+
 def _set_next_step_for_active_task(
     conn,
     context_id: int,
@@ -95,27 +175,8 @@ def _set_next_step_for_active_task(
     active_task_number: int,
     now: str,
 ) -> None:
-    next_step = _next_step_payload(
-        action="task.done",
-        reason="Active task in progress.",
-        allowed=[
-            "task.done",
-            "task.switch",
-            "task.new",
-            "task.show",
-            "task.status",
-            "task.logs",
-            "task.list",
-            "plan.show",
-            "plan.status",
-            "plan.logs",
-            "context.show",
-            "context.status",
-            "context.logs",
-            "context.list",
-            "context.switch",
-        ],
-        target={"task_number": active_task_number},
+    next_step = (
+        f"{_ACTIVE_TASK_NEXT_STEP_HEAD}{int(active_task_number)}{_ACTIVE_TASK_NEXT_STEP_TAIL}"
     )
     conn.execute(
         "UPDATE context_state SET next_step = ?, updated_at = ? WHERE context_id = ?",
@@ -124,23 +185,9 @@ def _set_next_step_for_active_task(
 
 
 def _set_next_step_for_new_task(conn, context_id: int, now: str) -> None:
-    next_step = _next_step_payload(
-        action="task.new",
-        reason="No active task is set.",
-        allowed=[
-            "task.new",
-            "plan.show",
-            "plan.status",
-            "context.show",
-            "context.status",
-            "context.logs",
-            "context.list",
-            "context.switch",
-        ],
-    )
     conn.execute(
         "UPDATE context_state SET next_step = ?, updated_at = ? WHERE context_id = ?",
-        (next_step, now, context_id),
+        (_NEW_TASK_NEXT_STEP, now, context_id),
     )
 
 
@@ -158,8 +205,7 @@ def create_task(
 ) -> tuple[int, int]:
     """Create a new task for a context."""
     now = db.utc_now_iso()
-    conn.execute("BEGIN")
-    try:
+    with db.transaction(conn):
         context_id = (
             resolve_active_context_id(conn, user_id=user_id, project_id=project_id)
             if context_ref is None
@@ -169,39 +215,31 @@ def create_task(
         if parent_id is not None and sort_index is not None:
             raise ValueError("sort_index is only valid for top-level tasks.")
 
-        if parent_id is not None:
-            parent = conn.execute(
-                "SELECT id FROM tasks WHERE id = ? AND context_id = ?",
-                (parent_id, context_id),
-            ).fetchone()
-            if not parent:
-                raise ValueError(
-                    f"Parent task {parent_id} not found in context {context_id}."
-                )
+        # One pass over the context's tasks for all three "next" values and
+        # the parent check (parent_found stays NULL when parent_id is None).
+        row = conn.execute(
+            "SELECT MAX(CASE WHEN parent_id IS NULL THEN sort_index END) AS max_sort, "
+            "MAX(CASE WHEN is_deleted = 0 THEN sub_index END) AS max_sub, "
+            "MAX(task_number) AS max_num, "
+            "MAX(id = ?) AS parent_found "
+            "FROM tasks WHERE context_id = ?",
+            (parent_id, context_id),
+        ).fetchone()
+
+        if parent_id is not None and not row["parent_found"]:
+            raise ValueError(
+                f"Parent task {parent_id} not found in context {context_id}."
+            )
 
         if parent_id is None and sort_index is None:
-            row = conn.execute(
-                "SELECT MAX(sort_index) AS max_sort FROM tasks "
-                "WHERE context_id = ? AND parent_id IS NULL",
-                (context_id,),
-            ).fetchone()
-            max_sort = row["max_sort"] if row else None
+            max_sort = row["max_sort"]
             sort_index = (int(max_sort) if max_sort is not None else 0) + 1
 
         if sub_index is None:
-            row = conn.execute(
-                "SELECT MAX(sub_index) AS max_sub FROM tasks "
-                "WHERE context_id = ? AND is_deleted = 0",
-                (context_id,),
-            ).fetchone()
-            max_sub = row["max_sub"] if row else None
+            max_sub = row["max_sub"]
             sub_index = (int(max_sub) if max_sub is not None else 0) + 1
 
-        row = conn.execute(
-            "SELECT MAX(task_number) AS max_num FROM tasks WHERE context_id = ?",
-            (context_id,),
-        ).fetchone()
-        max_num = row["max_num"] if row else None
+        max_num = row["max_num"]
         task_number = (int(max_num) if max_num is not None else 0) + 1
 
         cur = conn.execute(
@@ -222,46 +260,28 @@ def create_task(
         )
         task_id = int(cur.lastrowid)
 
-        # Make the new task active (only one active task per context).
-        active_row = conn.execute(
-            "SELECT active_task_id FROM context_state WHERE context_id = ?",
-            (context_id,),
-        ).fetchone()
-        active_task_id = active_row["active_task_id"] if active_row else None
-        if active_task_id:
-            conn.execute(
-                "UPDATE tasks SET status = 'planned', updated_at = ? WHERE id = ?",
-                (now, active_task_id),
-            )
-
+        # Make the new task active (only one active task per context): start
+        # it and put the previous active task, if any, back to planned.
         conn.execute(
-            "UPDATE tasks SET status = 'started', updated_at = ? WHERE id = ?",
-            (now, task_id),
+            "UPDATE tasks SET status = CASE WHEN id = ? THEN 'started' ELSE 'planned' END, "
+            "updated_at = ? "
+            "WHERE id IN (?, (SELECT active_task_id FROM context_state WHERE context_id = ?))",
+            (task_id, now, task_id, context_id),
         )
 
-        conn.execute(
-            "UPDATE context_state SET active_task_id = ?, last_task_id = ?, "
-            "last_event = ?, updated_at = ? WHERE context_id = ?",
-            (task_id, task_id, "Task Started", now, context_id),
-        )
+        _set_active_task(conn, context_id, task_id, "Task Started", now)
         _set_next_step_for_active_task(conn, context_id, task_id, task_number, now)
 
-        conn.execute(
-            "INSERT INTO changelog (context_id, task_id, action, details_md, created_at, actor) "
-            "VALUES (?, ?, ?, ?, ?, ?)",
-            (context_id, task_id, "Task Created", title, now, actor),
-        )
-        conn.execute(
+        conn.executemany(
             "INSERT INTO changelog (context_id, task_id, action, details_md, created_at, actor) "
             "VALUES (?, ?, ?, ?, ?, ?)",
-            (context_id, task_id, "Task Started", None, now, actor),
+            [
+                (context_id, task_id, "Task Created", title, now, actor),
+                (context_id, task_id, "Task Started", None, now, actor),
+            ],
         )
 
-        conn.commit()
         return task_id, task_number
-    except Exception:
-        conn.rollback()
-        raise
 
 
 def create_context(
@@ -285,8 +305,7 @@ def create_context(
     tasks_list = list(tasks or [])
     now = db.utc_now_iso()
 
-    conn.execute("BEGIN")
-    try:
+    with db.transaction(conn):
         cur = conn.execute(
             "INSERT INTO contexts (name, status, description_md, user_id, project_id, created_at, updated_at) "
             "VALUES (?, 'active', ?, ?, ?, ?, ?)",
@@ -294,13 +313,24 @@ def create_context(
         )
         context_id = int(cur.lastrowid)
 
+        task_ids = _insert_tasks(conn, context_id, tasks_list, now)
+        last_task_id = task_ids[-1] if task_ids else None
+
+        if auto_complete_first_task and task_ids:
+            last_task_id = task_ids[0]
+            conn.execute(
+                "UPDATE tasks SET status = 'complete', completed_at = ?, updated_at = ? WHERE id = ?",
+                (now, now, last_task_id),
+            )
+
+        # Written after the tasks so last_task_id goes in with the row.
         conn.execute(
             "INSERT INTO context_state (context_id, active_task_id, last_task_id, next_step, "
             "status_label, last_event, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
             (
                 context_id,
                 None,
-                None,
+                last_task_id,
                 next_step,
                 status_label,
                 "Context Created",
@@ -308,26 +338,7 @@ def create_context(
             ),
         )
 
-        task_ids = _insert_tasks(conn, context_id, tasks_list, now)
-        last_task_id = task_ids[-1] if task_ids else None
-
-        if last_task_id:
-            conn.execute(
-                "UPDATE context_state SET last_task_id = ? WHERE context_id = ?",
-                (last_task_id, context_id),
-            )
-
-        if auto_complete_first_task and task_ids:
-            first_id = task_ids[0]
-            conn.execute(
-                "UPDATE tasks SET status = 'complete', completed_at = ?, updated_at = ? WHERE id = ?",
-                (now, now, first_id),
-            )
-            conn.execute(
-                "UPDATE context_state SET last_task_id = ? WHERE context_id = ?",
-                (first_id, context_id),
-            )
-
+        changelog_rows: list[tuple] = []
         active_id = None
         if start_task_index is not None:
             if start_task_index < 1 or start_task_index > len(task_ids):
@@ -337,24 +348,15 @@ def create_context(
             active_id = task_ids[0]
 
         if active_id is not None:
-            conn.execute(
-                "UPDATE tasks SET status = 'started', updated_at = ? WHERE id = ?",
-                (now, active_id),
-            )
-            conn.execute(
-                "UPDATE context_state SET active_task_id = ?, last_task_id = ?, "
-                "last_event = ?, updated_at = ? WHERE context_id = ?",
-                (active_id, active_id, "Task Started", now, context_id),
-            )
-            conn.execute(
-                "INSERT INTO changelog (context_id, task_id, action, details_md, created_at, actor) "
-                "VALUES (?, ?, ?, ?, ?, ?)",
-                (context_id, active_id, "Task Started", None, now, actor),
-            )
             active_task_number = conn.execute(
-                "SELECT task_number FROM tasks WHERE id = ?",
-                (active_id,),
+                "UPDATE tasks SET status = 'started', updated_at = ? WHERE id = ? "
+                "RETURNING task_number",
+                (now, active_id),
             ).fetchone()["task_number"]
+            _set_active_task(conn, context_id, active_id, "Task Started", now)
+            changelog_rows.append(
+                (context_id, active_id, "Task Started", None, now, actor)
+            )
             _set_next_step_for_active_task(
                 conn, context_id, active_id, int(active_task_number), now
             )
@@ -366,17 +368,14 @@ def create_context(
                 db.upsert_user_state(conn, user_id, project_id, context_id)
             db.upsert_global_state(conn, context_id)
 
-        conn.execute(
-            "INSERT INTO changelog (context_id, action, details_md, created_at, actor) "
-            "VALUES (?, ?, ?, ?, ?)",
-            (context_id, "Context Created", None, now, actor),
+        changelog_rows.append((context_id, None, "Context Created", None, now, actor))
+        conn.executemany(
+            "INSERT INTO changelog (context_id, task_id, action, details_md, created_at, actor) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            changelog_rows,
         )
 
-        conn.commit()
         return context_id
-    except Exception:
-        conn.rollback()
-        raise
 
 
 def switch_context(
@@ -388,16 +387,13 @@ def switch_context(
 ) -> int:
     """Set the active context."""
     now = db.utc_now_iso()
-    conn.execute("BEGIN")
-    try:
-        context_id = resolve_context_id(conn, context_ref, project_id=project_id)
+    with db.transaction(conn):
+        context_id, ctx_status = resolve_context_id_with_status(
+            conn, context_ref, project_id=project_id,
+        )
 
         # Check if target is completed — gate on config
-        ctx_status_row = conn.execute(
-            "SELECT status FROM contexts WHERE id = ?", (context_id,),
-        ).fetchone()
-        if ctx_status_row and ctx_status_row["status"] == "completed":
-            from . import config
+        if ctx_status == "completed":
             cfg = config.get_config()
             if not cfg.get("workflow", {}).get("allow_reopen_completed", False):
                 raise ValueError(
@@ -417,21 +413,19 @@ def switch_context(
             "SELECT active_task_id FROM context_state WHERE context_id = ?",
             (context_id,),
         ).fetchone()
-        active_task_id = state_row["active_task_id"] if state_row else None
+        active_task_id = state_row[0] if state_row else None
+        changelog_rows = []
         if not active_task_id:
+            # First planned task, else the most recent non-deleted one.
             task_row = conn.execute(
-                "SELECT id FROM tasks WHERE context_id = ? AND status = 'planned' "
-                "AND is_deleted = 0 ORDER BY task_number LIMIT 1",
+                "SELECT id FROM tasks WHERE context_id = ? AND is_deleted = 0 "
+                "ORDER BY status = 'planned' DESC, "
+                "CASE WHEN status = 'planned' THEN task_number ELSE -task_number END "
+                "LIMIT 1",
                 (context_id,),
             ).fetchone()
-            if not task_row:
-                task_row = conn.execute(
-                    "SELECT id FROM tasks WHERE context_id = ? AND is_deleted = 0 "
-                    "ORDER BY task_number DESC LIMIT 1",
-                    (context_id,),
-                ).fetchone()
             if task_row:
-                active_task_id = int(task_row["id"])
+                active_task_id = int(task_row[0])
             else:
                 task_id, _task_number = create_task(
                     conn,
@@ -443,37 +437,25 @@ def switch_context(
                 active_task_id = task_id
 
             if active_task_id:
-                conn.execute(
-                    "UPDATE tasks SET status = 'started', updated_at = ? WHERE id = ?",
-                    (now, active_task_id),
-                )
-                conn.execute(
-                    "UPDATE context_state SET active_task_id = ?, last_task_id = ?, "
-                    "last_event = ?, updated_at = ? WHERE context_id = ?",
-                    (active_task_id, active_task_id, "Task Started", now, context_id),
-                )
                 active_task_number = conn.execute(
-                    "SELECT task_number FROM tasks WHERE id = ?",
-                    (active_task_id,),
+                    "UPDATE tasks SET status = 'started', updated_at = ? WHERE id = ? "
+                    "RETURNING task_number",
+                    (now, active_task_id),
                 ).fetchone()["task_number"]
+                _set_active_task(conn, context_id, active_task_id, "Task Started", now)
                 _set_next_step_for_active_task(
                     conn, context_id, active_task_id, int(active_task_number), now
                 )
-                conn.execute(
-                    "INSERT INTO changelog (context_id, task_id, action, details_md, created_at, actor) "
-                    "VALUES (?, ?, ?, ?, ?, ?)",
-                    (context_id, active_task_id, "Task Started", None, now, actor),
+                changelog_rows.append(
+                    (context_id, active_task_id, "Task Started", None, now, actor)
                 )
-        conn.execute(
-            "INSERT INTO changelog (context_id, action, details_md, created_at, actor) "
-            "VALUES (?, ?, ?, ?, ?)",
-            (context_id, "Context Switched", None, now, actor),
+        changelog_rows.append((context_id, None, "Context Switched", None, now, actor))
+        conn.executemany(
+            "INSERT INTO changelog (context_id, task_id, action, details_md, created_at, actor) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            changelog_rows,
         )
-        conn.commit()
         return context_id
-    except Exception:
-        conn.rollback()
-        raise
 
 def switch_task(
     conn,
@@ -485,16 +467,18 @@ def switch_task(
 ) -> int:
     """Switch the active task in a context by task number."""
     now = db.utc_now_iso()
-    conn.execute("BEGIN")
-    try:
+    with db.transaction(conn):
         context_id = (
             resolve_active_context_id(conn, user_id=user_id, project_id=project_id)
             if context_ref is None
             else resolve_context_id(conn, context_ref, project_id=project_id)
         )
+        # The target task and the goal/plan check in one query.
         task_row = conn.execute(
-            "SELECT id, is_deleted FROM tasks WHERE context_id = ? AND task_number = ?",
-            (context_id, task_number),
+            "SELECT t.id, t.is_deleted, g.has_goal, g.has_plan "
+            f"FROM tasks t, ({_GOAL_PLAN_PRESENT_SQL}) AS g "
+            "WHERE t.context_id = ? AND t.task_number = ?",
+            (context_id, context_id, task_number),
         ).fetchone()
         if not task_row:
             raise ValueError(f"Task {task_number} not found in context {context_id}.")
@@ -502,18 +486,15 @@ def switch_task(
             raise ValueError(f"Task {task_number} is deleted and cannot be activated.")
         target_task_id = int(task_row["id"])
 
-        _check_goal_plan_required(conn, context_id)
+        if config.get_config().get("workflow", {}).get("require_goal_and_plan", True):
+            _raise_if_goal_plan_missing(task_row["has_goal"], task_row["has_plan"])
 
         # Do not mutate other task statuses. Only set the active task to started.
         conn.execute(
             "UPDATE tasks SET status = 'started', updated_at = ? WHERE id = ?",
             (now, target_task_id),
         )
-        conn.execute(
-            "UPDATE context_state SET active_task_id = ?, last_task_id = ?, "
-            "last_event = ?, updated_at = ? WHERE context_id = ?",
-            (target_task_id, target_task_id, "Task Switched", now, context_id),
-        )
+        _set_active_task(conn, context_id, target_task_id, "Task Switched", now)
         _set_next_step_for_active_task(
             conn, context_id, target_task_id, task_number, now
         )
@@ -523,11 +504,7 @@ def switch_task(
             (context_id, target_task_id, "Task Switched", None, now, actor),
         )
 
-        conn.commit()
         return target_task_id
-    except Exception:
-        conn.rollback()
-        raise
 
 def _resolve_task_id_by_number(
     conn,
@@ -541,9 +518,10 @@ def _resolve_task_id_by_number(
     ).fetchone()
     if not row:
         raise ValueError(f"Task {task_number} not found in context {context_id}.")
-    if row["is_deleted"] == 1 and not allow_deleted:
+    task_id, is_deleted = row
+    if is_deleted == 1 and not allow_deleted:
         raise ValueError(f"Task {task_number} is deleted and cannot be modified.")
-    return int(row["id"])
+    return int(task_id)
 
 
 def _resolve_step_by_subindex(
@@ -574,17 +552,13 @@ def _renumber_steps(conn, context_id: int) -> None:
         "WHERE context_id = ? AND is_deleted = 0",
         (context_id,),
     )
-    rows = conn.execute(
-        "SELECT id FROM tasks "
-        "WHERE context_id = ? AND is_deleted = 0 "
-        "ORDER BY task_number",
+    conn.execute(
+        "UPDATE tasks SET sub_index = ranked.rn "
+        "FROM (SELECT id, ROW_NUMBER() OVER (ORDER BY task_number) AS rn "
+        "      FROM tasks WHERE context_id = ? AND is_deleted = 0) AS ranked "
+        "WHERE tasks.id = ranked.id",
         (context_id,),
-    ).fetchall()
-    for i, row in enumerate(rows, start=1):
-        conn.execute(
-            "UPDATE tasks SET sub_index = ? WHERE id = ?",
-            (i, row["id"]),
-        )
+    )
 
 
 def reorder_steps(conn, order: list[int], user_id=None, project_id=None) -> list[dict]:
@@ -628,56 +602,49 @@ def reorder_steps(conn, order: list[int], user_id=None, project_id=None) -> list
         raise ValueError("Order contains duplicate step numbers.")
 
     # Two-pass reassignment to avoid unique index conflicts.
-    conn.execute("BEGIN")
-    try:
+    with db.transaction(conn):
         conn.execute(
             "UPDATE tasks SET sub_index = NULL "
             "WHERE context_id = ? AND is_deleted = 0",
             (context_id,),
         )
-        mapping = []
-        for new_idx, old_idx in enumerate(order, start=1):
-            row = existing[old_idx]
-            conn.execute(
-                "UPDATE tasks SET sub_index = ? WHERE id = ?",
-                (new_idx, row["id"]),
-            )
-            mapping.append({
-                "old_index": old_idx,
-                "new_index": new_idx,
-                "title": row["title"],
-            })
-        conn.commit()
-    except Exception:
-        conn.rollback()
-        raise
+        conn.executemany(
+            "UPDATE tasks SET sub_index = ? WHERE id = ?",
+            [(new_idx, existing[old_idx]["id"]) for new_idx, old_idx in enumerate(order, start=1)],
+        )
 
-    return mapping
+    return [
+        {"old_index": old_idx, "new_index": new_idx, "title": existing[old_idx]["title"]}
+        for new_idx, old_idx in enumerate(order, start=1)
+    ]
 
 
 VALID_NOTE_KINDS = ("goal", "plan", "note")
 
 
+# has_goal/has_plan for one context; migration placeholders don't count
+# (GLOB, unlike LIKE, is case-sensitive).
+_GOAL_PLAN_PRESENT_SQL = (
+    "SELECT MAX(kind = 'goal') AS has_goal, MAX(kind = 'plan') AS has_plan "
+    "FROM context_notes WHERE context_id = ? AND kind IN ('goal', 'plan') "
+    "AND note_md NOT GLOB '(migrated*'"
+)
+
+
 def _check_goal_plan_required(conn, context_id: int) -> None:
     """Raise if config requires goal+plan notes and they're missing real content."""
-    from . import config
-    get_config = config.get_config
-    cfg = get_config()
+    cfg = config.get_config()
     if not cfg.get("workflow", {}).get("require_goal_and_plan", True):
         return
-    rows = conn.execute(
-        "SELECT kind, note_md FROM context_notes WHERE context_id = ? AND kind IN ('goal', 'plan')",
-        (context_id,),
-    ).fetchall()
-    kinds_present = set()
-    for r in rows:
-        # Migration placeholders don't count
-        if not r["note_md"].startswith("(migrated"):
-            kinds_present.add(r["kind"])
+    row = conn.execute(_GOAL_PLAN_PRESENT_SQL, (context_id,)).fetchone()
+    _raise_if_goal_plan_missing(row["has_goal"], row["has_plan"])
+
+
+def _raise_if_goal_plan_missing(has_goal, has_plan) -> None:
     missing = []
-    if "goal" not in kinds_present:
+    if not has_goal:
         missing.append("goal")
-    if "plan" not in kinds_present:
+    if not has_plan:
         missing.append("plan")
     if missing:
         raise ValueError(
@@ -686,6 +653,16 @@ def _check_goal_plan_required(conn, context_id: int) -> None:
         )
 
 
+# Result keys for list_task_notes / list_context_notes, in SELECT order.
+_TASK_NOTE_KEYS = ("id", "note", "created_at", "kind")
+_CONTEXT_NOTE_KEYS = ("id", "note", "created_at", "actor", "kind")
+# Result keys for get_plan_show's tasks, the changelog event lists and the
+# project report's steps.
+_PLAN_TASK_KEYS = ("id", "task_number", "title", "description_md", "status", "is_deleted")
+_CHANGELOG_EVENT_KEYS = ("id", "action", "details_md", "created_at", "actor", "task_id")
+_REPORT_STEP_KEYS = ("task_number", "title", "status", "description_md", "is_deleted")
+
+
 def list_task_notes(
     conn,
     task_number: int | None = None,
@@ -704,23 +681,59 @@ def list_task_notes(
             "SELECT active_task_id FROM context_state WHERE context_id = ?",
             (context_id,),
         ).fetchone()
-        if not state_row or not state_row["active_task_id"]:
+        if not state_row or not state_row[0]:
             return []
-        task_id = int(state_row["active_task_id"])
+        task_id = int(state_row[0])
     else:
         task_id = _resolve_task_id_by_number(conn, context_id, task_number, allow_deleted=False)
 
     if kind:
-        rows = conn.execute(
+        cur = conn.execute(
             "SELECT id, note_md, created_at, kind FROM task_notes WHERE task_id = ? AND kind = ? ORDER BY id",
             (task_id, kind),
-        ).fetchall()
+        )
     else:
-        rows = conn.execute(
+        cur = conn.execute(
             "SELECT id, note_md, created_at, kind FROM task_notes WHERE task_id = ? ORDER BY id",
             (task_id,),
-        ).fetchall()
-    return [{"id": row["id"], "note": row["note_md"], "created_at": row["created_at"], "kind": row["kind"]} for row in rows]
+        )
+    cur.row_factory = None  # plain tuples, zipped with the fixed key order
+    return [dict(zip(_TASK_NOTE_KEYS, row)) for row in cur]
+
+
+def _update_task_note(conn, note_id: int, note_md: str, now: str, actor: str | None) -> int:
+    """Rewrite an existing task note; the owning task and context come from the note."""
+    row = conn.execute(
+        "SELECT n.task_id, t.context_id FROM task_notes n JOIN tasks t ON t.id = n.task_id WHERE n.id = ?",
+        (note_id,),
+    ).fetchone()
+    if not row:
+        raise ValueError(f"Task note with id {note_id} not found.")
+    conn.execute(
+        "UPDATE task_notes SET note_md = ?, created_at = ? WHERE id = ?",
+        (note_md, now, note_id),
+    )
+    conn.execute(
+        "INSERT INTO changelog (context_id, task_id, action, details_md, created_at, actor) "
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        (row[1], row[0], "Task Note Updated", note_md, now, actor),
+    )
+    return note_id
+
+
+def _insert_task_note(
+    conn, context_id: int, task_id: int, note_md: str, kind: str, now: str, actor: str | None
+) -> int:
+    cur = conn.execute(
+        "INSERT INTO task_notes (task_id, note_md, created_at, kind) VALUES (?, ?, ?, ?)",
+        (task_id, note_md, now, kind),
+    )
+    conn.execute(
+        "INSERT INTO changelog (context_id, task_id, action, details_md, created_at, actor) "
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        (context_id, task_id, "Task Note Added", note_md, now, actor),
+    )
+    return int(cur.lastrowid)
 
 
 def add_task_note(
@@ -737,8 +750,10 @@ def add_task_note(
     if kind not in VALID_NOTE_KINDS:
         raise ValueError(f"Invalid note kind '{kind}'. Must be one of: {', '.join(VALID_NOTE_KINDS)}")
     now = db.utc_now_iso()
-    conn.execute("BEGIN")
-    try:
+    if note_id is not None:
+        with db.transaction(conn):
+            return _update_task_note(conn, note_id, note_md, now, actor)
+    with db.transaction(conn):
         if context_ref is None:
             context_id = resolve_active_context_id(conn, user_id=user_id, project_id=project_id)
         else:
@@ -749,45 +764,97 @@ def add_task_note(
                 "SELECT active_task_id FROM context_state WHERE context_id = ?",
                 (context_id,),
             ).fetchone()
-            if not state_row or not state_row["active_task_id"]:
+            if not state_row or not state_row[0]:
                 raise ValueError("No active task is set for this context.")
-            task_id = int(state_row["active_task_id"])
+            task_id = int(state_row[0])
         else:
             task_id = _resolve_task_id_by_number(conn, context_id, task_number, allow_deleted=False)
 
-        # Upsert: if note_id provided, update existing; otherwise insert new
-        if note_id is not None:
-            conn.execute(
-                "UPDATE task_notes SET note_md = ?, created_at = ? WHERE id = ?",
-                (note_md, now, note_id),
-            )
-            result_id = note_id
-            changelog_action = "Task Note Updated"
+        return _insert_task_note(conn, context_id, task_id, note_md, kind, now, actor)
+
+
+def add_task_notes_bulk(
+    conn,
+    notes: Iterable[dict],
+    context_ref: str | int | None = None,
+    actor: str | None = None,
+    user_id: int | None = None,
+    project_id: int | None = None,
+) -> list[int]:
+    """Insert many task notes in one transaction; return their ids in order.
+
+    Each note is a dict with ``note_md`` and optional ``task_number`` (the
+    active task when omitted) and ``kind`` (default "note").  Unlike
+    add_task_note there is no upsert by id; every note is a new row.
+    """
+    notes = list(notes)
+    for note in notes:
+        kind = note.get("kind", "note")
+        if kind not in VALID_NOTE_KINDS:
+            raise ValueError(f"Invalid note kind '{kind}'. Must be one of: {', '.join(VALID_NOTE_KINDS)}")
+    if not notes:
+        return []
+    now = db.utc_now_iso()
+    with db.transaction(conn):
+        if context_ref is None:
+            context_id = resolve_active_context_id(conn, user_id=user_id, project_id=project_id)
         else:
-            cur = conn.execute(
-                "INSERT INTO task_notes (task_id, note_md, created_at, kind) VALUES (?, ?, ?, ?)",
-                (task_id, note_md, now, kind),
-            )
-            result_id = int(cur.lastrowid)
-            changelog_action = "Task Note Added"
+            context_id = resolve_context_id(conn, context_ref)
 
-        conn.execute(
+        task_ids: dict[int | None, int] = {}
+        numbers = sorted({n["task_number"] for n in notes if n.get("task_number") is not None})
+        if numbers:
+            placeholders = ",".join("?" for _ in numbers)
+            rows = conn.execute(
+                "SELECT task_number, id, is_deleted FROM tasks "
+                f"WHERE context_id = ? AND task_number IN ({placeholders})",
+                (context_id, *numbers),
+            ).fetchall()
+            found = {int(r[0]): r for r in rows}
+            for number in numbers:
+                row = found.get(number)
+                if row is None:
+                    raise ValueError(f"Task {number} not found in context {context_id}.")
+                if row[2] == 1:
+                    raise ValueError(f"Task {number} is deleted and cannot be modified.")
+                task_ids[number] = int(row[1])
+        if any(n.get("task_number") is None for n in notes):
+            state_row = conn.execute(
+                "SELECT active_task_id FROM context_state WHERE context_id = ?",
+                (context_id,),
+            ).fetchone()
+            if not state_row or not state_row[0]:
+                raise ValueError("No active task is set for this context.")
+            task_ids[None] = int(state_row[0])
+
+        rows = [
+            (task_ids[n.get("task_number")], n["note_md"], now, n.get("kind", "note"))
+            for n in notes
+        ]
+        # executemany() has no lastrowid per row.  The write lock is held,
+        # so every id above the current maximum is one of ours.
+        last_id = conn.execute("SELECT MAX(id) FROM task_notes").fetchone()[0] or 0
+        conn.executemany(
+            "INSERT INTO task_notes (task_id, note_md, created_at, kind) VALUES (?, ?, ?, ?)",
+            rows,
+        )
+        note_ids = [
+            int(r[0]) for r in conn.execute(
+                "SELECT id FROM task_notes WHERE id > ? ORDER BY id", (last_id,)
+            )
+        ]
+        conn.executemany(
             "INSERT INTO changelog (context_id, task_id, action, details_md, created_at, actor) "
             "VALUES (?, ?, ?, ?, ?, ?)",
-            (context_id, task_id, changelog_action, note_md, now, actor),
+            [(context_id, row[0], "Task Note Added", row[1], now, actor) for row in rows],
         )
 
-        conn.commit()
-        return result_id
-    except Exception:
-        conn.rollback()
-        raise
+        return note_ids
 
 
 def delete_task_note(conn, note_id: int) -> None:
     """Delete a task note by ID."""
-    conn.execute("BEGIN")
-    try:
+    with db.transaction(conn):
         row = conn.execute("SELECT task_id, note_md FROM task_notes WHERE id = ?", (note_id,)).fetchone()
         if not row:
             raise ValueError(f"Task note with id {note_id} not found.")
@@ -800,10 +867,6 @@ def delete_task_note(conn, note_id: int) -> None:
             "VALUES (?, ?, ?, ?, ?)",
             (task_row["context_id"] if task_row else None, row["task_id"], "Task Note Deleted", row["note_md"][:100], now),
         )
-        conn.commit()
-    except Exception:
-        conn.rollback()
-        raise
 
 
 def list_context_notes(
@@ -819,16 +882,43 @@ def list_context_notes(
         context_id = resolve_context_id(conn, context_ref)
 
     if kind:
-        rows = conn.execute(
+        cur = conn.execute(
             "SELECT id, note_md, created_at, actor, kind FROM context_notes WHERE context_id = ? AND kind = ? ORDER BY id",
             (context_id, kind),
-        ).fetchall()
+        )
     else:
-        rows = conn.execute(
+        cur = conn.execute(
             "SELECT id, note_md, created_at, actor, kind FROM context_notes WHERE context_id = ? ORDER BY id",
             (context_id,),
-        ).fetchall()
-    return [{"id": row["id"], "note": row["note_md"], "created_at": row["created_at"], "actor": row["actor"], "kind": row["kind"]} for row in rows]
+        )
+    cur.row_factory = None  # plain tuples, zipped with the fixed key order
+    return [dict(zip(_CONTEXT_NOTE_KEYS, row)) for row in cur]
+
+
+def _update_context_note(conn, context_id: int, note_id: int, note_md: str, now: str, actor: str | None) -> int:
+    conn.execute(
+        "UPDATE context_notes SET note_md = ?, created_at = ?, actor = ? WHERE id = ?",
+        (note_md, now, actor, note_id),
+    )
+    conn.execute(
+        "INSERT INTO changelog (context_id, action, details_md, created_at, actor) "
+        "VALUES (?, ?, ?, ?, ?)",
+        (context_id, "Context Note Updated", note_md, now, actor),
+    )
+    return note_id
+
+
+def _insert_context_note(conn, context_id: int, note_md: str, kind: str, now: str, actor: str | None) -> int:
+    cur = conn.execute(
+        "INSERT INTO context_notes (context_id, note_md, created_at, actor, kind) VALUES (?, ?, ?, ?, ?)",
+        (context_id, note_md, now, actor, kind),
+    )
+    conn.execute(
+        "INSERT INTO changelog (context_id, action, details_md, created_at, actor) "
+        "VALUES (?, ?, ?, ?, ?)",
+        (context_id, "Context Note Added", note_md, now, actor),
+    )
+    return int(cur.lastrowid)
 
 
 def add_context_note(
@@ -844,58 +934,41 @@ def add_context_note(
     if kind not in VALID_NOTE_KINDS:
         raise ValueError(f"Invalid note kind '{kind}'. Must be one of: {', '.join(VALID_NOTE_KINDS)}")
     now = db.utc_now_iso()
-    conn.execute("BEGIN")
-    try:
+    # Editing a plain note by id: the note row already names its context.
+    if note_id is not None and kind not in ("goal", "plan"):
+        with db.transaction(conn):
+            row = conn.execute("SELECT context_id FROM context_notes WHERE id = ?", (note_id,)).fetchone()
+            if not row:
+                raise ValueError(f"Context note with id {note_id} not found.")
+            return _update_context_note(conn, row[0], note_id, note_md, now, actor)
+    with db.transaction(conn):
         if context_ref is None:
             context_id = resolve_active_context_id(conn, user_id=user_id, project_id=project_id)
         else:
             context_id = resolve_context_id(conn, context_ref)
 
-        # Upsert logic: for goal/plan kinds, replace existing by (context_id, kind).
-        # For note kind, update by ID if provided.
-        existing_id = None
+        # goal/plan are singletons per context: rewrite the existing one in
+        # place, and insert only when there is nothing to rewrite.
         if kind in ("goal", "plan"):
             row = conn.execute(
-                "SELECT id FROM context_notes WHERE context_id = ? AND kind = ?",
-                (context_id, kind),
+                "UPDATE context_notes SET note_md = ?, created_at = ?, actor = ? "
+                "WHERE id = (SELECT id FROM context_notes WHERE context_id = ? AND kind = ? "
+                "ORDER BY id LIMIT 1) RETURNING id",
+                (note_md, now, actor, context_id, kind),
             ).fetchone()
             if row:
-                existing_id = row[0]
-        elif note_id is not None:
-            existing_id = note_id
-
-        if existing_id is not None:
-            conn.execute(
-                "UPDATE context_notes SET note_md = ?, created_at = ?, actor = ? WHERE id = ?",
-                (note_md, now, actor, existing_id),
-            )
-            result_id = existing_id
-            changelog_action = "Context Note Updated"
-        else:
-            cur = conn.execute(
-                "INSERT INTO context_notes (context_id, note_md, created_at, actor, kind) VALUES (?, ?, ?, ?, ?)",
-                (context_id, note_md, now, actor, kind),
-            )
-            result_id = int(cur.lastrowid)
-            changelog_action = "Context Note Added"
-
-        conn.execute(
-            "INSERT INTO changelog (context_id, action, details_md, created_at, actor) "
-            "VALUES (?, ?, ?, ?, ?)",
-            (context_id, changelog_action, note_md, now, actor),
-        )
-
-        conn.commit()
-        return result_id
-    except Exception:
-        conn.rollback()
-        raise
+                conn.execute(
+                    "INSERT INTO changelog (context_id, action, details_md, created_at, actor) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (context_id, "Context Note Updated", note_md, now, actor),
+                )
+                return int(row[0])
+        return _insert_context_note(conn, context_id, note_md, kind, now, actor)
 
 
 def delete_context_note(conn, note_id: int) -> None:
     """Delete a context note by ID."""
-    conn.execute("BEGIN")
-    try:
+    with db.transaction(conn):
         row = conn.execute("SELECT context_id, note_md FROM context_notes WHERE id = ?", (note_id,)).fetchone()
         if not row:
             raise ValueError(f"Context note with id {note_id} not found.")
@@ -906,10 +979,6 @@ def delete_context_note(conn, note_id: int) -> None:
             "VALUES (?, ?, ?, ?)",
             (row["context_id"], "Context Note Deleted", row["note_md"][:100], now),
         )
-        conn.commit()
-    except Exception:
-        conn.rollback()
-        raise
 
 
 def get_project(conn, project_id: int | None = None, absolute_path: str | None = None) -> dict | None:
@@ -936,41 +1005,45 @@ def get_project(conn, project_id: int | None = None, absolute_path: str | None =
 
 def set_project(conn, project_id: int | None = None, project_name: str | None = None,
                 absolute_path: str | None = None, description_md: str | None = None) -> dict:
-    """Create or update a project row."""
+    """Create or update a project row.
+
+    Each path is a single statement that returns the resulting row;
+    arguments left as None keep their stored values.
+    """
     now = db.utc_now_iso()
 
     if project_id is not None:
-        existing = get_project(conn, project_id=project_id)
+        row = conn.execute(
+            "UPDATE project SET project_name = COALESCE(?, project_name), "
+            "absolute_path = COALESCE(?, absolute_path), "
+            "description_md = COALESCE(?, description_md) "
+            "WHERE id = ? "
+            "RETURNING id, project_name, absolute_path, description_md, created_at",
+            (project_name, absolute_path, description_md, project_id),
+        ).fetchone()
+        if row:
+            return dict(row)
     elif absolute_path is not None:
-        existing = get_project(conn, absolute_path=absolute_path)
-    else:
-        existing = None
+        # UPDATE first rather than INSERT ... ON CONFLICT: project.id is
+        # AUTOINCREMENT, and an upsert that hits the conflict still burns a
+        # sqlite_sequence value, leaving gaps in later project ids.
+        row = conn.execute(
+            "UPDATE project SET project_name = COALESCE(?, project_name), "
+            "description_md = COALESCE(?, description_md) "
+            "WHERE absolute_path = ? "
+            "RETURNING id, project_name, absolute_path, description_md, created_at",
+            (project_name, description_md, absolute_path),
+        ).fetchone()
+        if row:
+            return dict(row)
 
-    if existing is None:
-        cur = conn.execute(
-            "INSERT INTO project (project_name, absolute_path, description_md, created_at) "
-            "VALUES (?, ?, ?, ?)",
-            (project_name or "unnamed", absolute_path or "", description_md, now),
-        )
-        return get_project(conn, project_id=cur.lastrowid)
-    else:
-        updates, params = [], []
-        if project_name is not None:
-            updates.append("project_name = ?")
-            params.append(project_name)
-        if absolute_path is not None:
-            updates.append("absolute_path = ?")
-            params.append(absolute_path)
-        if description_md is not None:
-            updates.append("description_md = ?")
-            params.append(description_md)
-        if updates:
-            params.append(existing["id"])
-            conn.execute(
-                f"UPDATE project SET {', '.join(updates)} WHERE id = ?",
-                params,
-            )
-        return get_project(conn, project_id=existing["id"])
+    row = conn.execute(
+        "INSERT INTO project (project_name, absolute_path, description_md, created_at) "
+        "VALUES (?, ?, ?, ?) "
+        "RETURNING id, project_name, absolute_path, description_md, created_at",
+        (project_name or "unnamed", absolute_path or "", description_md, now),
+    ).fetchone()
+    return dict(row)
 
 
 def _project_usage_counts(conn, project_id: int) -> dict[str, int]:
@@ -1082,8 +1155,7 @@ def ensure_project(conn, cwd: str) -> tuple[dict, bool]:
     existing = get_project(conn, absolute_path=cwd)
     if existing is not None:
         return existing, False
-    from pathlib import Path
-    name = Path(cwd).name or "unnamed"
+    name = os.path.basename(cwd.rstrip("/\\")) or "unnamed"
     project = set_project(conn, project_name=name, absolute_path=cwd)
     return project, True
 
@@ -1148,7 +1220,7 @@ def purge_project(conn, project_id: int, *, force: bool = False) -> dict:
             )
 
     # Collect context IDs for cascaded deletes
-    context_ids = [r["id"] for r in conn.execute(
+    context_ids = [r[0] for r in conn.execute(
         "SELECT id FROM contexts WHERE project_id = ?", (project_id,)
     ).fetchall()]
 
@@ -1156,12 +1228,11 @@ def purge_project(conn, project_id: int, *, force: bool = False) -> dict:
     task_ids = []
     if context_ids:
         placeholders = ",".join("?" * len(context_ids))
-        task_ids = [r["id"] for r in conn.execute(
+        task_ids = [r[0] for r in conn.execute(
             f"SELECT id FROM tasks WHERE context_id IN ({placeholders})", context_ids
         ).fetchall()]
 
-    conn.execute("BEGIN")
-    try:
+    with db.transaction(conn):
         counts: dict[str, int] = {}
 
         # user_prefs: clear active_project_id (don't delete the pref row, just null it)
@@ -1226,16 +1297,15 @@ def purge_project(conn, project_id: int, *, force: bool = False) -> dict:
             # contexts
             cur = conn.execute(f"DELETE FROM contexts WHERE id IN ({placeholders})", context_ids)
             counts["contexts"] = cur.rowcount
+            cache = getattr(conn, "context_ids", None)
+            if cache is not None:
+                cache.clear()
         else:
             counts.update({"changelog": 0, "task_notes": 0, "tasks": 0,
                            "context_state": 0, "context_notes": 0, "contexts": 0})
 
         # project row
         conn.execute("DELETE FROM project WHERE id = ?", (project_id,))
-        conn.commit()
-    except Exception:
-        conn.rollback()
-        raise
 
     return {
         "project": project,
@@ -1253,15 +1323,16 @@ def delete_task(
 ) -> int:
     """Soft-delete a task by setting is_deleted = 1."""
     now = db.utc_now_iso()
-    conn.execute("BEGIN")
-    try:
+    with db.transaction(conn):
         context_id = (
             resolve_active_context_id(conn, user_id=user_id, project_id=project_id)
             if context_ref is None
             else resolve_context_id(conn, context_ref, project_id=project_id)
         )
         row = conn.execute(
-            "SELECT id, is_deleted FROM tasks WHERE context_id = ? AND task_number = ?",
+            "SELECT t.id, t.is_deleted, cs.active_task_id FROM tasks t "
+            "LEFT JOIN context_state cs ON cs.context_id = t.context_id "
+            "WHERE t.context_id = ? AND t.task_number = ?",
             (context_id, task_number),
         ).fetchone()
         if not row:
@@ -1269,18 +1340,13 @@ def delete_task(
         task_id = int(row["id"])
         if row["is_deleted"] == 1:
             raise ValueError(f"Task {task_number} is already deleted.")
+        active_task_id = row["active_task_id"]
 
         conn.execute(
             "UPDATE tasks SET is_deleted = 1, updated_at = ? WHERE id = ?",
             (now, task_id),
         )
 
-        state_row = conn.execute(
-            "SELECT active_task_id FROM context_state WHERE context_id = ?",
-            (context_id,),
-        ).fetchone()
-        active_task_id = state_row["active_task_id"] if state_row else None
-
         if active_task_id == task_id:
             replacement = conn.execute(
                 "SELECT id, task_number FROM tasks WHERE context_id = ? "
@@ -1290,11 +1356,7 @@ def delete_task(
             if replacement:
                 new_active_id = int(replacement["id"])
                 new_active_number = int(replacement["task_number"])
-                conn.execute(
-                    "UPDATE context_state SET active_task_id = ?, last_task_id = ?, "
-                    "last_event = ?, updated_at = ? WHERE context_id = ?",
-                    (new_active_id, new_active_id, "Task Switched", now, context_id),
-                )
+                _set_active_task(conn, context_id, new_active_id, "Task Switched", now)
                 _set_next_step_for_active_task(
                     conn, context_id, new_active_id, new_active_number, now
                 )
@@ -1318,11 +1380,7 @@ def delete_task(
             (context_id, task_id, "Task Deleted", None, now, actor),
         )
 
-        conn.commit()
         return task_id
-    except Exception:
-        conn.rollback()
-        raise
 
 
 def complete_task(
@@ -1335,8 +1393,7 @@ def complete_task(
 ) -> int:
     """Mark a task as complete (context-scoped task number)."""
     now = db.utc_now_iso()
-    conn.execute("BEGIN")
-    try:
+    with db.transaction(conn):
         context_id = (
             resolve_active_context_id(conn, user_id=user_id, project_id=project_id)
             if context_ref is None
@@ -1372,11 +1429,7 @@ def complete_task(
             (context_id, task_id, "Task Completed", None, now, actor),
         )
 
-        conn.commit()
         return task_id
-    except Exception:
-        conn.rollback()
-        raise
 
 
 def get_task_summary(
@@ -1392,19 +1445,16 @@ def get_task_summary(
         context_id = resolve_context_id(conn, context_ref)
 
     if task_number is None:
-        state_row = conn.execute(
-            "SELECT active_task_id FROM context_state WHERE context_id = ?",
+        row = conn.execute(
+            "SELECT t.id, t.context_id, t.task_number, t.title, t.description_md, t.status, "
+            "t.is_deleted, t.parent_id, t.sort_index, t.sub_index, t.created_at, t.updated_at, "
+            "t.completed_at "
+            "FROM context_state s JOIN tasks t ON t.id = s.active_task_id "
+            "WHERE s.context_id = ?",
             (context_id,),
         ).fetchone()
-        if not state_row or not state_row["active_task_id"]:
+        if not row:
             raise ValueError("No active step is set.")
-        active_id = int(state_row["active_task_id"])
-        row = conn.execute(
-            "SELECT id, context_id, task_number, title, description_md, status, is_deleted, parent_id, "
-            "sort_index, sub_index, created_at, updated_at, completed_at "
-            "FROM tasks WHERE id = ?",
-            (active_id,),
-        ).fetchone()
     else:
         row = conn.execute(
             "SELECT id, context_id, task_number, title, description_md, status, is_deleted, parent_id, "
@@ -1433,62 +1483,56 @@ def get_plan_show(conn, context_ref: str | int | None = None, user_id: int | Non
         if context_ref is None
         else resolve_context_id(conn, context_ref, project_id=project_id)
     )
-    context_row = conn.execute(
-        "SELECT id, name, description_md FROM contexts WHERE id = ?",
-        (context_id,),
-    ).fetchone()
-    if not context_row:
-        raise ValueError(f"Context {context_id} not found.")
-
-    state_row = conn.execute(
-        "SELECT active_task_id, status_label, last_event FROM context_state WHERE context_id = ?",
-        (context_id,),
-    ).fetchone()
-
-    tasks = conn.execute(
-        "SELECT id, sub_index AS task_number, title, description_md, status, is_deleted "
+    # One statement for the whole view: the context row (section 0), its
+    # live steps in sub_index order (1) and its notes in id order (2).
+    # The section and sort key lead each row; the rest is per-section.
+    cur = conn.execute(
+        "SELECT 0 AS section, 0 AS ord, c.name, c.description_md, s.status_label, s.last_event, "
+        "t.sub_index, NULL "
+        "FROM contexts c "
+        "LEFT JOIN context_state s ON s.context_id = c.id "
+        "LEFT JOIN tasks t ON t.id = s.active_task_id "
+        "WHERE c.id = ? "
+        "UNION ALL "
+        "SELECT 1, sub_index, id, sub_index, title, description_md, status, is_deleted "
         "FROM tasks WHERE context_id = ? AND is_deleted = 0 AND sub_index IS NOT NULL "
-        "ORDER BY sub_index",
-        (context_id,),
-    ).fetchall()
-
-    active_task_number = None
-    if state_row and state_row["active_task_id"]:
-        active_row = conn.execute(
-            "SELECT sub_index FROM tasks WHERE id = ?",
-            (state_row["active_task_id"],),
-        ).fetchone()
-        if active_row:
-            active_task_number = active_row["sub_index"]
-
-    # Fetch goal and plan notes for inline display
-    goal_plan_rows = conn.execute(
-        "SELECT id, kind, note_md FROM context_notes "
-        "WHERE context_id = ? AND kind IN ('goal', 'plan') AND note_md NOT LIKE '(migrated%' "
-        "ORDER BY kind, id",
-        (context_id,),
-    ).fetchall()
-    goal_notes = [r["note_md"] for r in goal_plan_rows if r["kind"] == "goal"]
-    plan_notes = [r["note_md"] for r in goal_plan_rows if r["kind"] == "plan"]
-
-    # Fetch all context notes with IDs for agent use
-    all_notes = conn.execute(
-        "SELECT id, note_md, created_at, actor, kind FROM context_notes WHERE context_id = ? ORDER BY id",
-        (context_id,),
-    ).fetchall()
-    notes_list = [{"id": r["id"], "note": r["note_md"], "created_at": r["created_at"], "actor": r["actor"], "kind": r["kind"]} for r in all_notes]
+        "UNION ALL "
+        "SELECT 2, id, id, note_md, created_at, actor, kind, NULL "
+        "FROM context_notes WHERE context_id = ? "
+        "ORDER BY section, ord",
+        (context_id, context_id, context_id),
+    )
+    cur.row_factory = None  # plain tuples, zipped with the fixed key order
+    rows = cur.fetchall()
+    if not rows or rows[0][0] != 0:
+        raise ValueError(f"Context {context_id} not found.")
+    name, description_md, status_label, last_event, active_task_number = rows[0][2:7]
+
+    # The latest goal and plan for inline display come from the note rows,
+    # skipping the "(migrated ...)" placeholders patch-9 inserted.
+    tasks = []
+    notes_list = []
+    latest = {"goal": None, "plan": None}
+    for row in rows[1:]:
+        if row[0] == 1:
+            tasks.append(dict(zip(_PLAN_TASK_KEYS, row[2:])))
+            continue
+        kind = row[6]
+        if kind in latest and row[3][:9].lower() != "(migrated":
+            latest[kind] = row[3]
+        notes_list.append(dict(zip(_CONTEXT_NOTE_KEYS, row[2:7])))
 
     return {
         "context_id": context_id,
-        "context_name": context_row["name"],
-        "context_title": context_row["description_md"] or context_row["name"],
-        "status_label": state_row["status_label"] if state_row else None,
-        "last_event": state_row["last_event"] if state_row else None,
+        "context_name": name,
+        "context_title": description_md or name,
+        "status_label": status_label,
+        "last_event": last_event,
         "active_task_number": active_task_number,
-        "goal": goal_notes[-1] if goal_notes else None,
-        "plan": plan_notes[-1] if plan_notes else None,
+        "goal": latest["goal"],
+        "plan": latest["plan"],
         "notes": notes_list,
-        "tasks": [dict(row) for row in tasks],
+        "tasks": tasks,
     }
 
 
@@ -1498,49 +1542,44 @@ def get_plan_status(conn, context_ref: str | int | None = None, user_id: int | N
         if context_ref is None
         else resolve_context_id(conn, context_ref, project_id=project_id)
     )
-    context_row = conn.execute(
-        "SELECT id, name, description_md FROM contexts WHERE id = ?",
-        (context_id,),
-    ).fetchone()
-    if not context_row:
+    # Context, its state and the active task's number, joined to one row per
+    # (status, is_deleted) bucket of the context's tasks.
+    cur = conn.execute(
+        "SELECT c.name, c.description_md, s.status_label, s.last_event, "
+        "t.sub_index AS active_task_number, k.status, k.is_deleted, k.n "
+        "FROM contexts c "
+        "LEFT JOIN context_state s ON s.context_id = c.id "
+        "LEFT JOIN tasks t ON t.id = s.active_task_id "
+        "LEFT JOIN (SELECT status, is_deleted, COUNT(*) AS n FROM tasks "
+        "WHERE context_id = ? GROUP BY status, is_deleted) k "
+        "WHERE c.id = ?",
+        (context_id, context_id),
+    )
+    cur.row_factory = None  # plain tuples
+    rows = cur.fetchall()
+    if not rows:
         raise ValueError(f"Context {context_id} not found.")
 
-    state_row = conn.execute(
-        "SELECT active_task_id, status_label, last_event FROM context_state WHERE context_id = ?",
-        (context_id,),
-    ).fetchone()
-
-    counts_row = conn.execute(
-        "SELECT "
-        "SUM(CASE WHEN status = 'planned' AND is_deleted = 0 THEN 1 ELSE 0 END) AS planned_count, "
-        "SUM(CASE WHEN status = 'started' AND is_deleted = 0 THEN 1 ELSE 0 END) AS started_count, "
-        "SUM(CASE WHEN status = 'complete' AND is_deleted = 0 THEN 1 ELSE 0 END) AS completed_count, "
-        "SUM(CASE WHEN status = 'blocked' AND is_deleted = 0 THEN 1 ELSE 0 END) AS blocked_count, SUM(CASE WHEN is_deleted = 1 THEN 1 ELSE 0 END) AS deleted_count "
-        "FROM tasks WHERE context_id = ?",
-        (context_id,),
-    ).fetchone()
-
-    active_task_number = None
-    if state_row and state_row["active_task_id"]:
-        active_row = conn.execute(
-            "SELECT sub_index FROM tasks WHERE id = ?",
-            (state_row["active_task_id"],),
-        ).fetchone()
-        if active_row:
-            active_task_number = active_row["sub_index"]
-
+    counts = dict.fromkeys(("planned", "started", "complete", "blocked"), 0)
+    deleted_count = 0
+    for *_, status, is_deleted, n in rows:
+        if is_deleted == 1:
+            deleted_count += n
+        elif status in counts:
+            counts[status] += n
+    name, description_md, status_label, last_event, active_task_number = rows[0][:5]
     return {
         "context_id": context_id,
-        "context_name": context_row["name"],
-        "context_title": context_row["description_md"] or context_row["name"],
-        "status_label": state_row["status_label"] if state_row else None,
-        "last_event": state_row["last_event"] if state_row else None,
+        "context_name": name,
+        "context_title": description_md or name,
+        "status_label": status_label,
+        "last_event": last_event,
         "active_task_number": active_task_number,
-        "planned_count": counts_row["planned_count"] if counts_row else 0,
-        "started_count": counts_row["started_count"] if counts_row else 0,
-        "completed_count": counts_row["completed_count"] if counts_row else 0,
-        "blocked_count": counts_row["blocked_count"] if counts_row else 0,
-        "deleted_count": counts_row["deleted_count"] if counts_row else 0,
+        "planned_count": counts["planned"],
+        "started_count": counts["started"],
+        "completed_count": counts["complete"],
+        "blocked_count": counts["blocked"],
+        "deleted_count": deleted_count,
     }
 
 
@@ -1565,26 +1604,23 @@ def list_contexts(conn, user_id: int | None = None, show_all_users: bool = False
     where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
 
     rows = conn.execute(
-        "SELECT c.id, c.name, c.status, c.description_md, c.user_id, "
+        "SELECT c.id, c.name, c.status, c.description_md, "
+        "COALESCE(NULLIF(u.display_name, ''), u.name) AS user_display, "
         "t.sub_index AS task_number, t.title "
         "FROM contexts c "
         "LEFT JOIN context_state s ON s.context_id = c.id "
-        "LEFT JOIN tasks t ON t.id = s.active_task_id"
+        "LEFT JOIN tasks t ON t.id = s.active_task_id "
+        "LEFT JOIN users u ON u.id = c.user_id"
         f"{where} ORDER BY c.id",
         params,
     ).fetchall()
 
-    # Build user display name lookup
-    user_names: dict[int, str] = {}
-    for u in conn.execute("SELECT id, name, display_name FROM users").fetchall():
-        user_names[u["id"]] = u["display_name"] or u["name"]
-
     contexts = []
     for row in rows:
-        uid = row["user_id"]
+        user_display = row["user_display"]
         entry = {
             "id": row["id"],
-            "user": user_names.get(uid, "unknown") if uid else "unknown",
+            "user": user_display if user_display is not None else "unknown",
             "name": row["name"],
             "status": row["status"],
             "title": row["description_md"] or row["name"],
@@ -1603,18 +1639,16 @@ def list_tasks(conn, context_ref: str | int | None = None, user_id: int | None =
         else resolve_context_id(conn, context_ref, project_id=project_id)
     )
     context_row = conn.execute(
-        "SELECT id, name, description_md FROM contexts WHERE id = ?",
+        "SELECT c.id, c.name, c.description_md, t.sub_index AS active_task_number "
+        "FROM contexts c "
+        "LEFT JOIN context_state s ON s.context_id = c.id "
+        "LEFT JOIN tasks t ON t.id = s.active_task_id "
+        "WHERE c.id = ?",
         (context_id,),
     ).fetchone()
     if not context_row:
         raise ValueError(f"Context {context_id} not found.")
-    active_row = conn.execute(
-        "SELECT t.sub_index FROM context_state s "
-        "JOIN tasks t ON t.id = s.active_task_id "
-        "WHERE s.context_id = ?",
-        (context_id,),
-    ).fetchone()
-    active_task_number = active_row["sub_index"] if active_row else None
+    active_task_number = context_row["active_task_number"]
     rows = conn.execute(
         "SELECT task_number, sub_index, title, status, is_deleted FROM tasks WHERE context_id = ? "
         "AND is_deleted = 0 AND sub_index IS NOT NULL "
@@ -1652,17 +1686,19 @@ def get_context_logs(conn, context_ref: str | int) -> dict:
     if not context_row:
         raise ValueError(f"Context {context_id} not found.")
 
-    rows = conn.execute(
+    cur = conn.execute(
         "SELECT id, action, details_md, created_at, actor, task_id "
         "FROM changelog WHERE context_id = ? ORDER BY id",
         (context_id,),
-    ).fetchall()
+    )
+    cur.row_factory = None  # plain tuples, zipped with the fixed key order
+    events = [dict(zip(_CHANGELOG_EVENT_KEYS, row)) for row in cur]
 
     return {
         "context_id": context_id,
         "context_name": context_row["name"],
         "context_title": context_row["description_md"] or context_row["name"],
-        "events": [dict(row) for row in rows],
+        "events": events,
     }
 
 
@@ -1678,60 +1714,58 @@ def get_task_logs(
     else:
         context_id = resolve_context_id(conn, context_ref)
 
+    # The task and its context's display columns in one lookup.
     task_row = conn.execute(
-        "SELECT id, task_number, title FROM tasks WHERE context_id = ? AND task_number = ?",
+        "SELECT t.id, t.task_number, t.title, c.name, c.description_md "
+        "FROM tasks t JOIN contexts c ON c.id = t.context_id "
+        "WHERE t.context_id = ? AND t.task_number = ?",
         (context_id, task_number),
     ).fetchone()
     if not task_row:
         raise ValueError(f"Task {task_number} not found in context {context_id}.")
 
-    rows = conn.execute(
+    cur = conn.execute(
         "SELECT id, action, details_md, created_at, actor, task_id "
         "FROM changelog WHERE task_id = ? ORDER BY id",
         (task_row["id"],),
-    ).fetchall()
-
-    context_row = conn.execute(
-        "SELECT id, name, description_md FROM contexts WHERE id = ?",
-        (context_id,),
-    ).fetchone()
+    )
+    cur.row_factory = None  # plain tuples, zipped with the fixed key order
+    events = [dict(zip(_CHANGELOG_EVENT_KEYS, row)) for row in cur]
 
     return {
         "context_id": context_id,
-        "context_name": context_row["name"] if context_row else str(context_id),
-        "context_title": context_row["description_md"] or context_row["name"]
-        if context_row
-        else str(context_id),
+        "context_name": task_row["name"],
+        "context_title": task_row["description_md"] or task_row["name"],
         "task_id": task_row["id"],
         "task_number": task_row["task_number"],
         "task_title": task_row["title"],
-        "events": [dict(row) for row in rows],
+        "events": events,
     }
 
 
+_INSERT_TASKS_CHUNK = 100  # rows per INSERT; 9 bound parameters each
+
+
 def _insert_tasks(conn, context_id: int, tasks: list[TaskInput], now: str) -> list[int]:
     if not tasks:
         return []
 
-    task_ids: list[int] = []
     top_level_counter = 0
     child_counter: dict[int, int] = {}
     row = conn.execute(
-        "SELECT MAX(task_number) AS max_num FROM tasks WHERE context_id = ?",
-        (context_id,),
-    ).fetchone()
-    max_num = row["max_num"] if row else None
-    task_number_counter = int(max_num) if max_num is not None else 0
-
-    # Get current max sub_index for top-level tasks.
-    sub_row = conn.execute(
-        "SELECT MAX(sub_index) AS max_sub FROM tasks "
-        "WHERE context_id = ? AND is_deleted = 0",
+        "SELECT MAX(task_number) AS max_num, "
+        "MAX(CASE WHEN is_deleted = 0 THEN sub_index END) AS max_sub "
+        "FROM tasks WHERE context_id = ?",
         (context_id,),
     ).fetchone()
-    sub_index_counter = int(sub_row["max_sub"]) if sub_row and sub_row["max_sub"] is not None else 0
-
-    for idx, task in enumerate(tasks):
+    max_num = row["max_num"]
+    first_task_number = (int(max_num) if max_num is not None else 0) + 1
+    # Current max sub_index for top-level tasks.
+    max_sub = row["max_sub"]
+    sub_index_counter = int(max_sub) if max_sub is not None else 0
+
+    rows = []
+    for task_number, task in enumerate(tasks, start=first_task_number):
         sort_index = task.sort_index
         sub_index = task.sub_index
         if task.parent_id is None and sort_index is None:
@@ -1745,26 +1779,36 @@ def _insert_tasks(conn, context_id: int, tasks: list[TaskInput], now: str) -> li
             child_counter[task.parent_id] = current
             sub_index = current
 
-        task_number_counter += 1
-        cur = conn.execute(
+        rows.append((
+            context_id,
+            task_number,
+            task.title,
+            task.description_md,
+            task.parent_id,
+            sort_index,
+            sub_index,
+            now,
+            now,
+        ))
+
+    # One multi-row INSERT per chunk.  Chunks stay under SQLite's historical
+    # 999 host-parameter limit; full chunks reuse one cached statement.
+    for start in range(0, len(rows), _INSERT_TASKS_CHUNK):
+        chunk = rows[start:start + _INSERT_TASKS_CHUNK]
+        values = ", ".join(["(?, ?, ?, ?, 'planned', 0, ?, ?, ?, ?, ?, NULL)"] * len(chunk))
+        conn.execute(
             "INSERT INTO tasks (context_id, task_number, title, description_md, status, is_deleted, parent_id, "
-            "sort_index, sub_index, created_at, updated_at, completed_at) "
-            "VALUES (?, ?, ?, ?, 'planned', 0, ?, ?, ?, ?, ?, NULL)",
-            (
-                context_id,
-                task_number_counter,
-                task.title,
-                task.description_md,
-                task.parent_id,
-                sort_index,
-                sub_index,
-                now,
-                now,
-            ),
+            f"sort_index, sub_index, created_at, updated_at, completed_at) VALUES {values}",
+            [param for row in chunk for param in row],
         )
-        task_ids.append(int(cur.lastrowid))
-
-    return task_ids
+    # Read the new ids back in insertion order using the task numbers just
+    # assigned.
+    id_rows = conn.execute(
+        "SELECT id FROM tasks WHERE context_id = ? AND task_number BETWEEN ? AND ? "
+        "ORDER BY task_number",
+        (context_id, first_task_number, first_task_number + len(rows) - 1),
+    ).fetchall()
+    return [int(r[0]) for r in id_rows]
 
 
 def adopt_context(
@@ -1786,8 +1830,7 @@ def adopt_context(
     Returns the new context_id.
     """
     now = db.utc_now_iso()
-    conn.execute("BEGIN")
-    try:
+    with db.transaction(conn):
         # 1. Resolve source context
         source_id = resolve_context_id(conn, source_name, project_id=project_id)
         source_row = conn.execute(
@@ -1838,12 +1881,14 @@ def adopt_context(
             "SELECT note_md, created_at, actor, kind FROM context_notes WHERE context_id = ? ORDER BY id",
             (source_id,),
         ).fetchall()
-        for note in source_notes:
-            conn.execute(
-                "INSERT INTO context_notes (context_id, note_md, created_at, actor, kind) "
-                "VALUES (?, ?, ?, ?, ?)",
-                (new_context_id, note["note_md"], note["created_at"], note["actor"], note["kind"]),
-            )
+        conn.executemany(
+            "INSERT INTO context_notes (context_id, note_md, created_at, actor, kind) "
+            "VALUES (?, ?, ?, ?, ?)",
+            [
+                (new_context_id, note["note_md"], note["created_at"], note["actor"], note["kind"])
+                for note in source_notes
+            ],
+        )
 
         # 7. Copy tasks (steps) with parent_id remapping
         source_tasks = conn.execute(
@@ -1853,75 +1898,75 @@ def adopt_context(
             (source_id,),
         ).fetchall()
 
-        old_to_new: dict[int, int] = {}  # old task.id → new task.id
-        first_task_id = None
-
-        for task in source_tasks:
-            task_status = STATUS_PLANNED if reset else task["status"]
-            task_completed = None if reset else task["completed_at"]
-
-            cur = conn.execute(
-                "INSERT INTO tasks (context_id, task_number, title, description_md, status, is_deleted, "
-                "parent_id, sort_index, sub_index, created_at, updated_at, completed_at) "
-                "VALUES (?, ?, ?, ?, ?, ?, NULL, ?, ?, ?, ?, ?)",
+        conn.executemany(
+            "INSERT INTO tasks (context_id, task_number, title, description_md, status, is_deleted, "
+            "parent_id, sort_index, sub_index, created_at, updated_at, completed_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, NULL, ?, ?, ?, ?, ?)",
+            [
                 (
                     new_context_id,
                     task["task_number"],
                     task["title"],
                     task["description_md"],
-                    task_status,
+                    STATUS_PLANNED if reset else task["status"],
                     task["is_deleted"],
                     task["sort_index"],
                     task["sub_index"],
                     now,
                     now,
-                    task_completed,
-                ),
+                    None if reset else task["completed_at"],
+                )
+                for task in source_tasks
+            ],
+        )
+        # executemany() has no lastrowid per row.  The new context holds only
+        # the copies, and task numbers are unique per context, so reading ids
+        # back by task_number lines them up with source_tasks.
+        new_ids = [
+            int(r[0]) for r in conn.execute(
+                "SELECT id FROM tasks WHERE context_id = ? ORDER BY task_number",
+                (new_context_id,),
             )
-            new_task_id = int(cur.lastrowid)
+        ]
+        old_to_new: dict[int, int] = {}  # old task.id → new task.id
+        first_task_id = None
+        for task, new_task_id in zip(source_tasks, new_ids):
             old_to_new[task["id"]] = new_task_id
             if first_task_id is None and task["is_deleted"] == 0:
                 first_task_id = new_task_id
 
-        # Second pass: fix parent_id references
-        for old_id, new_id in old_to_new.items():
-            source_task = conn.execute(
-                "SELECT parent_id FROM tasks WHERE id = ?", (old_id,),
-            ).fetchone()
-            if source_task and source_task["parent_id"] is not None:
-                new_parent = old_to_new.get(source_task["parent_id"])
-                if new_parent is not None:
-                    conn.execute(
-                        "UPDATE tasks SET parent_id = ? WHERE id = ?",
-                        (new_parent, new_id),
-                    )
-
-        # 8. Copy task_notes (step notes)
-        for old_task_id, new_task_id in old_to_new.items():
-            step_notes = conn.execute(
-                "SELECT note_md, created_at, kind FROM task_notes WHERE task_id = ? ORDER BY id",
-                (old_task_id,),
-            ).fetchall()
-            for note in step_notes:
-                conn.execute(
-                    "INSERT INTO task_notes (task_id, note_md, created_at, kind) VALUES (?, ?, ?, ?)",
-                    (new_task_id, note["note_md"], note["created_at"], note["kind"]),
-                )
+        # Second pass: fix parent_id references from the rows already read
+        conn.executemany(
+            "UPDATE tasks SET parent_id = ? WHERE id = ?",
+            [
+                (old_to_new[task["parent_id"]], old_to_new[task["id"]])
+                for task in source_tasks
+                if task["parent_id"] in old_to_new
+            ],
+        )
+
+        # 8. Copy task_notes (step notes), step by step in task_number order
+        step_notes = conn.execute(
+            "SELECT n.task_id, n.note_md, n.created_at, n.kind FROM task_notes n "
+            "JOIN tasks t ON t.id = n.task_id WHERE t.context_id = ? ORDER BY t.task_number, n.id",
+            (source_id,),
+        ).fetchall()
+        conn.executemany(
+            "INSERT INTO task_notes (task_id, note_md, created_at, kind) VALUES (?, ?, ?, ?)",
+            [
+                (old_to_new[note["task_id"]], note["note_md"], note["created_at"], note["kind"])
+                for note in step_notes
+            ],
+        )
 
         # 9. Set first non-deleted step as active
         if first_task_id is not None:
-            conn.execute(
-                "UPDATE tasks SET status = 'started', updated_at = ? WHERE id = ?",
-                (now, first_task_id),
-            )
             first_task_number = conn.execute(
-                "SELECT task_number FROM tasks WHERE id = ?", (first_task_id,),
+                "UPDATE tasks SET status = 'started', updated_at = ? WHERE id = ? "
+                "RETURNING task_number",
+                (now, first_task_id),
             ).fetchone()["task_number"]
-            conn.execute(
-                "UPDATE context_state SET active_task_id = ?, last_task_id = ?, "
-                "last_event = ?, updated_at = ? WHERE context_id = ?",
-                (first_task_id, first_task_id, "Task Started", now, new_context_id),
-            )
+            _set_active_task(conn, new_context_id, first_task_id, "Task Started", now)
             _set_next_step_for_active_task(
                 conn, new_context_id, first_task_id, int(first_task_number), now
             )
@@ -1950,11 +1995,7 @@ def adopt_context(
             ),
         )
 
-        conn.commit()
         return new_context_id
-    except Exception:
-        conn.rollback()
-        raise
 
 
 # =============================================================================
@@ -2059,14 +2100,9 @@ def delete_step(conn, step_number, task_ref=None, user_id=None, project_id=None)
     context_id = resolve_active_context_id(conn, user_id=user_id, project_id=project_id)
     task_id, task_number = _resolve_step_by_subindex(conn, context_id, step_number)
     delete_task(conn, task_number, context_ref=task_ref, user_id=user_id, project_id=project_id)
-    conn.execute("BEGIN")
-    try:
+    with db.transaction(conn):
         conn.execute("UPDATE tasks SET sub_index = NULL WHERE id = ?", (task_id,))
         _renumber_steps(conn, context_id)
-        conn.commit()
-    except Exception:
-        conn.rollback()
-        raise
     return task_id
 
 
@@ -2113,61 +2149,65 @@ def get_project_report_data(
     if project_id is not None:
         project = db.get_project_by_id(conn, project_id)
 
-    # All tasks for this user/project
-    tasks = list_tasks(conn, user_id=user_id, project_id=project_id)
-    # Also include completed
+    # All tasks for this user/project, including completed ones
     all_tasks = list_tasks(conn, status_filter=None, user_id=user_id, project_id=project_id)
 
-    # For each task, get goal/plan notes and step counts
-    task_details = []
-    for t in all_tasks:
-        ctx_id = t["id"]
-        # Goal and plan notes
-        goal_plan_rows = conn.execute(
-            "SELECT kind, note_md FROM context_notes "
-            "WHERE context_id = ? AND kind IN ('goal', 'plan') AND note_md NOT LIKE '(migrated%' "
-            "ORDER BY kind, id",
-            (ctx_id,),
-        ).fetchall()
-        goal = None
-        plan = None
-        for r in goal_plan_rows:
-            if r["kind"] == "goal":
-                goal = r["note_md"]
-            elif r["kind"] == "plan":
-                plan = r["note_md"]
-
-        # Step counts
-        counts = conn.execute(
-            "SELECT "
+    # Goal/plan notes, step counts and steps for every task, fetched with
+    # one query each and bucketed by context id.
+    goals: dict[int, str] = {}
+    plans: dict[int, str] = {}
+    step_counts: dict[int, tuple[int, int]] = {}
+    steps_by_ctx: dict[int, list[dict]] = {}
+    ctx_ids = [t["id"] for t in all_tasks]
+    if ctx_ids:
+        placeholders = ",".join("?" for _ in ctx_ids)
+        for r in conn.execute(
+            "SELECT context_id, kind, note_md FROM context_notes "
+            f"WHERE context_id IN ({placeholders}) AND kind IN ('goal', 'plan') "
+            "AND note_md NOT LIKE '(migrated%' "
+            "ORDER BY context_id, kind, id",
+            ctx_ids,
+        ):
+            # Latest note of each kind wins.
+            (goals if r["kind"] == "goal" else plans)[r["context_id"]] = r["note_md"]
+
+        for r in conn.execute(
+            "SELECT context_id, "
             "SUM(CASE WHEN status = 'complete' AND is_deleted = 0 THEN 1 ELSE 0 END) AS done, "
             "SUM(CASE WHEN is_deleted = 0 THEN 1 ELSE 0 END) AS total "
-            "FROM tasks WHERE context_id = ?",
-            (ctx_id,),
-        ).fetchone()
+            f"FROM tasks WHERE context_id IN ({placeholders}) GROUP BY context_id",
+            ctx_ids,
+        ):
+            step_counts[r["context_id"]] = (r["done"] or 0, r["total"] or 0)
 
-        # Steps detail
-        steps = conn.execute(
-            "SELECT sub_index AS task_number, title, status, description_md, is_deleted "
-            "FROM tasks WHERE context_id = ? AND is_deleted = 0 AND sub_index IS NOT NULL "
-            "ORDER BY sub_index",
-            (ctx_id,),
-        ).fetchall()
+        cur = conn.execute(
+            "SELECT context_id, sub_index AS task_number, title, status, description_md, is_deleted "
+            f"FROM tasks WHERE context_id IN ({placeholders}) AND is_deleted = 0 "
+            "AND sub_index IS NOT NULL "
+            "ORDER BY context_id, sub_index",
+            ctx_ids,
+        )
+        cur.row_factory = None  # plain tuples, zipped with the fixed key order
+        for ctx_id, *step in cur:
+            steps_by_ctx.setdefault(ctx_id, []).append(dict(zip(_REPORT_STEP_KEYS, step)))
 
+    task_details = []
+    for t in all_tasks:
+        ctx_id = t["id"]
+        done, total = step_counts.get(ctx_id, (0, 0))
         task_details.append({
             "id": ctx_id,
             "name": t["name"],
             "title": t.get("title", t["name"]),
             "status": t.get("status", "active"),
-            "goal": goal,
-            "plan": plan,
-            "steps_done": counts["done"] or 0 if counts else 0,
-            "steps_total": counts["total"] or 0 if counts else 0,
-            "steps": [dict(s) for s in steps],
+            "goal": goals.get(ctx_id),
+            "plan": plans.get(ctx_id),
+            "steps_done": done,
+            "steps_total": total,
+            "steps": steps_by_ctx.get(ctx_id, []),
         })
 
     # Config
-    from . import config
     cfg = config.get_config()
 
     return {
@@ -2189,8 +2229,13 @@ def get_task_report_data(
     else:
         context_id = resolve_context_id(conn, context_ref, project_id=project_id)
 
+    # Context and its active step in one lookup.
     context_row = conn.execute(
-        "SELECT id, name, status, description_md FROM contexts WHERE id = ?",
+        "SELECT c.id, c.name, c.status, c.description_md, t.sub_index AS active_step "
+        "FROM contexts c "
+        "LEFT JOIN context_state s ON s.context_id = c.id "
+        "LEFT JOIN tasks t ON t.id = s.active_task_id "
+        "WHERE c.id = ?",
         (context_id,),
     ).fetchone()
     if not context_row:
@@ -2221,35 +2266,28 @@ def get_task_report_data(
         (context_id,),
     ).fetchall()
 
+    # All step notes in one query, bucketed by step.
+    notes_by_step: dict[int, list[dict]] = {}
+    for n in conn.execute(
+        "SELECT n.task_id, n.note_md, n.created_at, n.kind FROM task_notes n "
+        "JOIN tasks t ON t.id = n.task_id "
+        "WHERE t.context_id = ? AND t.is_deleted = 0 AND t.sub_index IS NOT NULL "
+        "ORDER BY n.id",
+        (context_id,),
+    ):
+        note = dict(n)
+        notes_by_step.setdefault(note.pop("task_id"), []).append(note)
+
     steps_data = []
     for s in steps:
-        step_notes = conn.execute(
-            "SELECT note_md, created_at, kind FROM task_notes "
-            "WHERE task_id = ? ORDER BY id",
-            (s["id"],),
-        ).fetchall()
         steps_data.append({
             "number": s["sub_index"],
             "title": s["title"],
             "status": s["status"],
             "description": s["description_md"],
-            "notes": [dict(n) for n in step_notes],
+            "notes": notes_by_step.get(s["id"], []),
         })
 
-    # Active step
-    state_row = conn.execute(
-        "SELECT active_task_id FROM context_state WHERE context_id = ?",
-        (context_id,),
-    ).fetchone()
-    active_step_num = None
-    if state_row and state_row["active_task_id"]:
-        active_row = conn.execute(
-            "SELECT sub_index FROM tasks WHERE id = ?",
-            (state_row["active_task_id"],),
-        ).fetchone()
-        if active_row:
-            active_step_num = active_row["sub_index"]
-
     return {
         "context_id": context_id,
         "name": context_row["name"],
@@ -2259,7 +2297,7 @@ def get_task_report_data(
         "plans": plans,
         "notes": [dict(n) for n in note_rows],
         "steps": steps_data,
-        "active_step": active_step_num,
+        "active_step": context_row["active_step"],
     }
 
 
@@ -2302,33 +2340,23 @@ def attach_file(
         raise ValueError("Exactly one of project_id, context_id, or task_id must be provided.")
     _validate_attachment_path(file_path, workspace_dir)
     now = db.utc_now_iso()
-    conn.execute("BEGIN")
-    try:
+    with db.transaction(conn):
         cur = conn.execute(
             "INSERT INTO attachments (file_path, label, kind, project_id, context_id, task_id, created_at) "
             "VALUES (?, ?, ?, ?, ?, ?, ?)",
             (file_path, label, kind, project_id, context_id, task_id, now),
         )
         attachment_id = int(cur.lastrowid)
-        conn.commit()
-    except Exception:
-        conn.rollback()
-        raise
     return {"id": attachment_id, "file_path": file_path, "label": label, "kind": kind}
 
 
 def detach_file(conn, attachment_id: int) -> None:
     """Remove an attachment by ID."""
-    conn.execute("BEGIN")
-    try:
+    with db.transaction(conn):
         row = conn.execute("SELECT id FROM attachments WHERE id = ?", (attachment_id,)).fetchone()
         if row is None:
             raise ValueError(f"Attachment id {attachment_id} not found.")
         conn.execute("DELETE FROM attachments WHERE id = ?", (attachment_id,))
-        conn.commit()
-    except Exception:
-        conn.rollback()
-        raise
 
 
 def list_attachments(
@@ -6,25 +6,93 @@ import shutil
 import sqlite3
 import re
 import string
+from contextlib import contextmanager
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Optional
+from typing import Iterator, Optional
 
 
 def utc_now_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
 
 
+class PlanConnection(sqlite3.Connection):
+    """sqlite3 connection that carries per-connection lookup caches.
+
+    The tool opens one connection per command, so anything cached here
+    lives for a single command only.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # (context_ref, project_id) -> context id, filled by
+        # context.resolve_context_id and cleared when contexts are deleted.
+        self.context_ids: dict[tuple[str | int, Optional[int]], int] = {}
+
+    def close(self) -> None:
+        # SQLite recommends PRAGMA optimize just before closing: it re-runs
+        # ANALYZE only on tables whose statistics have gone stale for the
+        # queries this connection ran, and is a no-op otherwise.  It is
+        # best-effort, so it never waits on another writer's lock.
+        try:
+            self.execute("PRAGMA busy_timeout=0;")
+            self.execute("PRAGMA optimize;")
+        except sqlite3.Error:
+            pass  # already closed, or the database is read-only/busy
+        super().close()
+
+
+# UPDATE ... RETURNING (3.35) and UPDATE ... FROM (3.33) are used throughout
+# context.py; older libraries reject them with a bare syntax error.
+MIN_SQLITE_VERSION = (3, 35, 0)
+
+
 def connect(db_path: Path) -> sqlite3.Connection:
-    conn = sqlite3.connect(db_path, isolation_level=None)
+    if sqlite3.sqlite_version_info < MIN_SQLITE_VERSION:
+        raise RuntimeError(
+            f"mcpp-plan needs SQLite {'.'.join(map(str, MIN_SQLITE_VERSION))} or newer; "
+            f"this Python is linked against SQLite {sqlite3.sqlite_version}."
+        )
+    # context.py and db.py issue well over 128 distinct statements (the
+    # sqlite3 default); a larger cache keeps them all prepared.  The 30s
+    # timeout is SQLite's busy_timeout: a BEGIN IMMEDIATE that meets another
+    # writer waits for it instead of failing with "database is locked".
+    conn = sqlite3.connect(
+        db_path, timeout=30.0, isolation_level=None, cached_statements=512,
+        factory=PlanConnection,
+    )
     conn.execute("PRAGMA foreign_keys=ON;")
     conn.execute("PRAGMA journal_mode=WAL;")
+    # In WAL mode NORMAL only fsyncs at checkpoints; a power loss can drop
+    # the last commits but never corrupts the database.
+    conn.execute("PRAGMA synchronous=NORMAL;")
+    conn.execute("PRAGMA temp_store=MEMORY;")
+    conn.execute("PRAGMA cache_size=-65536;")
+    conn.execute("PRAGMA mmap_size=268435456;")
     conn.row_factory = sqlite3.Row
     return conn
 
 
+@contextmanager
+def transaction(conn: sqlite3.Connection) -> Iterator[sqlite3.Connection]:
+    """Run the block in a BEGIN IMMEDIATE transaction.
+
+    Commits when the block finishes (including via return) and rolls back
+    if it raises.
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.rollback()
+        raise
+    conn.commit()
+
+
 LATEST_SCHEMA_VERSION = 13
 
+_PATCH_RE = re.compile(r"patch-(\d+)\.sql")
+
 
 # ── Central DB path ──
 
@@ -38,24 +106,29 @@ def apply_schema_patches(conn: sqlite3.Connection, current_version: int) -> int:
     if not patches_dir.exists():
         return current_version
 
-    patches = []
-    for path in patches_dir.glob("patch-*.sql"):
-        match = re.match(r"patch-(\d+)\.sql", path.name)
-        if not match:
-            continue
-        patches.append((int(match.group(1)), path))
-
-    for version, path in sorted(patches):
-        if version <= current_version:
-            continue
-        # Disable FK checks for migrations that recreate tables.
-        conn.execute("PRAGMA foreign_keys = OFF")
-        conn.executescript(path.read_text(encoding="utf-8"))
+    patches = sorted(
+        (int(m.group(1)), path)
+        for path in patches_dir.glob("patch-*.sql")
+        if (m := _PATCH_RE.match(path.name))
+    )
+
+    applied = current_version
+    # Disable FK checks for migrations that recreate tables.
+    conn.execute("PRAGMA foreign_keys = OFF")
+    try:
+        for version, path in patches:
+            if version <= current_version:
+                continue
+            conn.executescript(path.read_text(encoding="utf-8"))
+            applied = version
+    finally:
         conn.execute("PRAGMA foreign_keys = ON")
-        set_schema_version(conn, version)
-        current_version = version
+        # Record the version once, even if a later patch failed, so a
+        # retry does not re-run the patches that already went in.
+        if applied != current_version:
+            set_schema_version(conn, applied)
 
-    return current_version
+    return applied
 
 def get_schema_version(conn: sqlite3.Connection) -> Optional[int]:
     try:
@@ -114,6 +187,10 @@ def ensure_schema(conn: sqlite3.Connection) -> None:
         "CREATE INDEX IF NOT EXISTS idx_changelog_task_created "
         "ON changelog(task_id, created_at);"
     )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_changelog_task_id "
+        "ON changelog(task_id, id);"
+    )
 
     columns = {row["name"] for row in conn.execute("PRAGMA table_info(tasks)").fetchall()}
     if "is_deleted" in columns:
@@ -121,6 +198,13 @@ def ensure_schema(conn: sqlite3.Connection) -> None:
             "CREATE INDEX IF NOT EXISTS idx_tasks_context_deleted "
             "ON tasks(context_id, is_deleted);"
         )
+        # Covers get_plan_status's per-(status, is_deleted) task counts.  It
+        # supersedes the (context_id, status) index older schemas created.
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_tasks_context_status_deleted "
+            "ON tasks(context_id, status, is_deleted);"
+        )
+        conn.execute("DROP INDEX IF EXISTS idx_tasks_context_status;")
 
     # Schema version tracking (for migrations).
     version = get_schema_version(conn)
@@ -144,7 +228,7 @@ def ensure_schema(conn: sqlite3.Connection) -> None:
             from .backup import (
                 create_verified_backup, table_row_counts,
                 validate_row_counts, MigrationAborted,
-                _apply_patches_to,
+                _apply_patches_to, _load_patches, _open_trial_copy,
             )
             patches_dir = Path(__file__).resolve().parent / "schema_patches"
 
@@ -155,36 +239,32 @@ def ensure_schema(conn: sqlite3.Connection) -> None:
                 # Step 2: Snapshot pre-migration row counts.
                 pre_counts = table_row_counts(conn)
 
-                # Steps 3-5: Trial migration on a temporary copy.
-                import tempfile, os as _os
-                tmp_fd, tmp_name = tempfile.mkstemp(suffix=".db", prefix="plan_migrate_")
-                tmp_path = Path(tmp_name)
-                _os.close(tmp_fd)
+                # Steps 3-5: Trial migration on a private copy.
+                tmp_conn, tmp_path = _open_trial_copy(db_path)
                 try:
-                    shutil.copy2(db_path, tmp_path)
-                    tmp_conn = sqlite3.connect(tmp_path, isolation_level=None)
-                    tmp_conn.row_factory = sqlite3.Row
                     try:
-                        try:
-                            _apply_patches_to(tmp_conn, version, LATEST_SCHEMA_VERSION, patches_dir)
-                        except sqlite3.Error as sql_err:
-                            raise MigrationAborted(
-                                f"Trial migration FAILED — SQL error: {sql_err}. "
-                                f"Live database NOT touched.  Backup at: {backup_path}"
-                            ) from sql_err
-                        trial_counts = table_row_counts(tmp_conn)
-                    finally:
-                        tmp_conn.close()
-
-                    trial_errors = validate_row_counts(pre_counts, trial_counts)
-                    if trial_errors:
-                        detail = "; ".join(trial_errors)
+                        _apply_patches_to(
+                            tmp_conn, version,
+                            _load_patches(patches_dir, version, LATEST_SCHEMA_VERSION),
+                        )
+                    except sqlite3.Error as sql_err:
                         raise MigrationAborted(
-                            f"Trial migration FAILED — data loss detected: {detail}. "
+                            f"Trial migration FAILED — SQL error: {sql_err}. "
                             f"Live database NOT touched.  Backup at: {backup_path}"
-                        )
+                        ) from sql_err
+                    trial_counts = table_row_counts(tmp_conn)
                 finally:
-                    tmp_path.unlink(missing_ok=True)
+                    tmp_conn.close()
+                    if tmp_path is not None:
+                        tmp_path.unlink(missing_ok=True)
+
+                trial_errors = validate_row_counts(pre_counts, trial_counts)
+                if trial_errors:
+                    detail = "; ".join(trial_errors)
+                    raise MigrationAborted(
+                        f"Trial migration FAILED — data loss detected: {detail}. "
+                        f"Live database NOT touched.  Backup at: {backup_path}"
+                    )
 
                 # Step 6: Apply patches to the live DB.
                 version = apply_schema_patches(conn, version)
@@ -208,6 +288,19 @@ def ensure_schema(conn: sqlite3.Connection) -> None:
     if "project_id" in ctx_columns:
         conn.execute("CREATE INDEX IF NOT EXISTS idx_contexts_project ON contexts(project_id);")
         conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_contexts_project_name ON contexts(project_id, name);")
+    note_columns = {row["name"] for row in conn.execute("PRAGMA table_info(context_notes)").fetchall()}
+    if "kind" in note_columns:
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_context_notes_context_kind ON context_notes(context_id, kind);")
+        # Its (context_id) prefix serves every lookup the old single-column
+        # index did, including the foreign-key check on context deletes.
+        conn.execute("DROP INDEX IF EXISTS idx_context_notes_context;")
+    task_columns = {row["name"] for row in conn.execute("PRAGMA table_info(tasks)").fetchall()}
+    if {"is_deleted", "sub_index"} <= task_columns:
+        # Live steps in display order; tombstones are left out of the index.
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_tasks_context_live_steps "
+            "ON tasks(context_id, sub_index) WHERE is_deleted = 0;"
+        )
 
     # Backfill missing task numbers per context in id order.
     conn.execute(
@@ -253,6 +346,7 @@ def ensure_schema(conn: sqlite3.Connection) -> None:
     # Post-patch-9: split notes containing ## Goal / ## Plan headers into typed rows.
     cn_columns = {row["name"] for row in conn.execute("PRAGMA table_info(context_notes)").fetchall()}
     if "kind" in cn_columns:
+        _ensure_goal_plan_unique(conn)
         _backfill_goal_plan_notes(conn)
 
     # Daily auto-backup with retention pruning.
@@ -289,29 +383,25 @@ def _backfill_goal_plan_notes(conn: sqlite3.Connection) -> None:
         goal_match = re.search(r'## Goal\s*\n(.*?)(?=\n## |\Z)', text, re.DOTALL)
         plan_match = re.search(r'## Plan\s*\n(.*?)(?=\n## |\Z)', text, re.DOTALL)
 
-        if goal_match:
-            goal_text = goal_match.group(1).strip()
-            if goal_text:
-                conn.execute(
-                    "INSERT INTO context_notes (context_id, note_md, created_at, actor, kind) VALUES (?, ?, ?, ?, 'goal')",
-                    (context_id, goal_text, created_at, actor),
-                )
-                # Remove migration placeholder for this context
-                conn.execute(
-                    "DELETE FROM context_notes WHERE context_id = ? AND kind = 'goal' AND note_md LIKE '(migrated%'",
-                    (context_id,),
-                )
-
-        if plan_match:
-            plan_text = plan_match.group(1).strip()
-            if plan_text:
-                conn.execute(
-                    "INSERT INTO context_notes (context_id, note_md, created_at, actor, kind) VALUES (?, ?, ?, ?, 'plan')",
-                    (context_id, plan_text, created_at, actor),
-                )
+        for kind, match in (("goal", goal_match), ("plan", plan_match)):
+            section_text = match.group(1).strip() if match else ""
+            if not section_text:
+                continue
+            # Remove the migration placeholder, then replace the context's
+            # goal/plan in place (there is at most one, see ensure_schema).
+            conn.execute(
+                "DELETE FROM context_notes WHERE context_id = ? AND kind = ? AND note_md LIKE '(migrated%'",
+                (context_id, kind),
+            )
+            updated = conn.execute(
+                "UPDATE context_notes SET note_md = ?, created_at = ?, actor = ? "
+                "WHERE context_id = ? AND kind = ? RETURNING id",
+                (section_text, created_at, actor, context_id, kind),
+            ).fetchone()
+            if not updated:
                 conn.execute(
-                    "DELETE FROM context_notes WHERE context_id = ? AND kind = 'plan' AND note_md LIKE '(migrated%'",
-                    (context_id,),
+                    "INSERT INTO context_notes (context_id, note_md, created_at, actor, kind) VALUES (?, ?, ?, ?, ?)",
+                    (context_id, section_text, created_at, actor, kind),
                 )
 
         # Reclassify the original note — remove the ## Goal/## Plan sections, keep remainder as 'note'
@@ -324,6 +414,33 @@ def _backfill_goal_plan_notes(conn: sqlite3.Connection) -> None:
             conn.execute("DELETE FROM context_notes WHERE id = ?", (row["id"],))
 
 
+def _ensure_goal_plan_unique(conn: sqlite3.Connection) -> None:
+    """Create the one-goal/one-plan-per-context unique index (patch-9 invariant).
+
+    Runs its dedupe only while the index is missing.  Placeholders give way
+    to a real row of the same kind; of the rest, the newest row (the one
+    get_plan_show displays) keeps its kind and older ones become plain notes.
+    """
+    if conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_context_notes_goal_plan'"
+    ).fetchone():
+        return
+    with transaction(conn):
+        conn.execute(
+            "DELETE FROM context_notes AS n WHERE kind IN ('goal', 'plan') AND note_md LIKE '(migrated%' "
+            "AND EXISTS (SELECT 1 FROM context_notes r WHERE r.context_id = n.context_id "
+            "AND r.kind = n.kind AND r.note_md NOT LIKE '(migrated%')"
+        )
+        conn.execute(
+            "UPDATE context_notes AS n SET kind = 'note' WHERE kind IN ('goal', 'plan') "
+            "AND id < (SELECT MAX(id) FROM context_notes r WHERE r.context_id = n.context_id AND r.kind = n.kind)"
+        )
+        conn.execute(
+            "CREATE UNIQUE INDEX idx_context_notes_goal_plan "
+            "ON context_notes(context_id, kind) WHERE kind IN ('goal', 'plan');"
+        )
+
+
 def upsert_global_state(conn: sqlite3.Connection, context_id: Optional[int]) -> None:
     conn.execute(
         "INSERT OR REPLACE INTO global_state (id, active_context_id, updated_at) VALUES (1, ?, ?)",
@@ -337,7 +454,7 @@ def get_active_context_id(conn: sqlite3.Connection) -> Optional[int]:
     ).fetchone()
     if not row:
         return None
-    return row["active_context_id"]
+    return row[0]
 
 
 # ── User helpers ──
@@ -352,7 +469,7 @@ def get_or_create_user(conn: sqlite3.Connection, name: str) -> int:
     """Return user id, creating the row if it doesn't exist."""
     row = conn.execute("SELECT id FROM users WHERE name = ?", (name,)).fetchone()
     if row:
-        return int(row["id"])
+        return int(row[0])
     cur = conn.execute(
         "INSERT INTO users (name, created_at) VALUES (?, ?)",
         (name, utc_now_iso()),
@@ -412,7 +529,7 @@ def get_active_context_id_for_user(conn: sqlite3.Connection, user_id: int, proje
         ).fetchone()
     if not row:
         return None
-    return row["active_context_id"]
+    return row[0]
 
 
 # ── Project helpers ──
@@ -424,7 +541,7 @@ def get_or_create_project(conn: sqlite3.Connection, absolute_path: str, project_
         (absolute_path,),
     ).fetchone()
     if row:
-        return int(row["id"])
+        return int(row[0])
     name = project_name or Path(absolute_path).name or "unnamed"
     cur = conn.execute(
         "INSERT INTO project (project_name, absolute_path, description_md, created_at) "
@@ -210,14 +210,24 @@ def get_info(context: dict[str, Any] | None = None) -> dict[str, Any]:
     }
 
 
+_config_mod = None
+
+
 def _load_config_mod():
-    """Load config module standalone (no dependency on _load_pkg)."""
-    import importlib.util as ilu
-    cfg_path = Path(__file__).resolve().parent / "config.py"
-    spec = ilu.spec_from_file_location("_plan_config_rx", str(cfg_path))
-    mod = ilu.module_from_spec(spec)
-    spec.loader.exec_module(mod)  # type: ignore[union-attr]
-    return mod
+    """Load config module standalone (no dependency on _load_pkg).
+
+    Loaded once per process: get_config() re-reads config.yaml whenever the
+    file changes, so keeping the module keeps its parse cache warm.
+    """
+    global _config_mod
+    if _config_mod is None:
+        import importlib.util as ilu
+        cfg_path = Path(__file__).resolve().parent / "config.py"
+        spec = ilu.spec_from_file_location("_plan_config_rx", str(cfg_path))
+        mod = ilu.module_from_spec(spec)
+        spec.loader.exec_module(mod)  # type: ignore[union-attr]
+        _config_mod = mod
+    return _config_mod
 
 
 def _pkg_path() -> Path:
@@ -244,11 +254,9 @@ def _load_pkg(pkg_path: Path):
     if db_spec.loader:
         db_spec.loader.exec_module(plan_db_mod)
 
-    config_spec = importlib.util.spec_from_file_location("mcpp_plan.config", pkg_path / "config.py")
-    config_mod = importlib.util.module_from_spec(config_spec)
-    sys.modules["mcpp_plan.config"] = config_mod
-    if config_spec.loader:
-        config_spec.loader.exec_module(config_mod)
+    # Share the process-wide config module (and its parse cache) with the
+    # package instead of re-executing config.py on every load.
+    sys.modules["mcpp_plan.config"] = _load_config_mod()
 
     context_spec = importlib.util.spec_from_file_location("mcpp_plan.context", pkg_path / "context.py")
     plan_ctx = importlib.util.module_from_spec(context_spec)
@@ -1555,15 +1563,15 @@ def _cmd_file_list(workspace_dir: str, args: dict[str, Any]) -> dict[str, Any]:
 
 def _cmd_config_show(workspace_dir: str, args: dict[str, Any]) -> dict[str, Any]:
     """Show current config (merged defaults + file overrides)."""
-    from mcpp_plan.config import get_config, DEFAULTS, config_path
-    cfg = get_config()
-    lines = ["**Configuration**", f"File: `{config_path()}`"]
+    cfg_mod = _load_config_mod()
+    cfg = cfg_mod.get_config()
+    lines = ["**Configuration**", f"File: `{cfg_mod.config_path()}`"]
     for section, keys in cfg.items():
         if isinstance(keys, dict):
             lines.append(f"\n**{section}**")
-            defaults_section = DEFAULTS.get(section, {})
+            defaults_section = cfg_mod.DEFAULTS.get(section, {})
             for key, value in keys.items():
-                default = defaults_section.get(key) if isinstance(defaults_section, dict) else None
+                default = defaults_section.get(key)
                 suffix = "" if value == default else f" (default: {default})"
                 lines.append(f"  - **{key}**: `{value}`{suffix}")
     return {"success": True, "result": cfg, "display": "\n".join(lines)}
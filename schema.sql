@@ -136,13 +136,17 @@ CREATE INDEX IF NOT EXISTS idx_attachments_project  ON attachments(project_id);
 CREATE INDEX IF NOT EXISTS idx_attachments_context  ON attachments(context_id);
 CREATE INDEX IF NOT EXISTS idx_attachments_task     ON attachments(task_id);
 
-CREATE INDEX IF NOT EXISTS idx_tasks_context_status ON tasks(context_id, status);
 CREATE INDEX IF NOT EXISTS idx_tasks_parent ON tasks(parent_id);
+CREATE INDEX IF NOT EXISTS idx_tasks_context_parent_sort ON tasks(context_id, parent_id, sort_index);
 CREATE INDEX IF NOT EXISTS idx_task_notes_task ON task_notes(task_id);
-CREATE INDEX IF NOT EXISTS idx_context_notes_context ON context_notes(context_id);
 CREATE INDEX IF NOT EXISTS idx_changelog_context_created ON changelog(context_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_changelog_context_id ON changelog(context_id, id);
 CREATE INDEX IF NOT EXISTS idx_changelog_task_created ON changelog(task_id, created_at);
 CREATE UNIQUE INDEX IF NOT EXISTS idx_tasks_context_number ON tasks(context_id, task_number);
 CREATE INDEX IF NOT EXISTS idx_contexts_user ON contexts(user_id);
 -- NOTE: idx_contexts_project and idx_contexts_project_name are created
 -- by patch-7.sql for existing DBs, and by ensure_schema() post-patch for new DBs.
+-- idx_changelog_task_id, idx_context_notes_context_kind,
+-- idx_tasks_context_status_deleted and the partial idx_context_notes_goal_plan
+-- and idx_tasks_context_live_steps are created by ensure_schema(), once the
+-- changelog.task_id, context_notes.kind and tasks.is_deleted/sub_index columns exist.
@@ -14,9 +14,11 @@ Usage:
 
 from __future__ import annotations
 
+import hashlib
 import os
 import shutil
 import sqlite3
+import sys
 import tempfile
 from pathlib import Path
 
@@ -42,6 +44,11 @@ def report(name: str, ok: bool, detail: str = ""):
     print(f"  [{status}] {name}{suffix}")
 
 
+def _sha256(path: Path) -> str:
+    """Hex SHA-256 of a file, to prove the live DB was left byte-for-byte alone."""
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
 def make_test_db(db_path: Path, schema_version: int = 6) -> None:
     """Create a test DB at the given schema version with real data.
 
@@ -185,21 +192,6 @@ def make_test_db(db_path: Path, schema_version: int = 6) -> None:
 # Tests
 # ═══════════════════════════════════════════════════════════════
 
-def test_sha256_file():
-    """Test SHA-256 checksum of a file."""
-    print("\n== sha256_file ==")
-    tmp = Path(tempfile.mktemp(suffix=".txt"))
-    try:
-        tmp.write_text("hello world")
-        h = backup.sha256_file(tmp)
-        report("returns hex string", len(h) == 64 and all(c in "0123456789abcdef" for c in h))
-        # Same content = same hash.
-        h2 = backup.sha256_file(tmp)
-        report("deterministic", h == h2)
-    finally:
-        tmp.unlink(missing_ok=True)
-
-
 def test_table_row_counts():
     """Test row count snapshot."""
     print("\n== table_row_counts ==")
@@ -234,15 +226,33 @@ def test_create_verified_backup():
         report("backup file exists", backup_path.exists())
         report("backup in .backups dir", ".backups" in str(backup_path))
 
-        # Verify checksums match.
-        live_hash = backup.sha256_file(db_path)
-        backup_hash = backup.sha256_file(backup_path)
-        report("checksums match", live_hash == backup_hash)
+        # Verify the snapshot is sound and holds the same data.
+        conn = sqlite3.connect(backup_path)
+        integrity = conn.execute("PRAGMA integrity_check").fetchone()[0]
+        backup_counts = backup.table_row_counts(conn)
+        conn.close()
+        conn = sqlite3.connect(db_path)
+        live_counts = backup.table_row_counts(conn)
+        conn.close()
+        report("integrity check ok", integrity == "ok")
+        report("row counts match", backup_counts == live_counts)
 
         # Second backup gets different name.
         backup_path2 = backup.create_verified_backup(db_path)
         report("second backup different name", backup_path2 != backup_path)
         report("second backup exists", backup_path2.exists())
+
+        # Committed rows still sitting in the WAL must reach the backup.
+        writer = sqlite3.connect(db_path, isolation_level=None)
+        writer.execute("PRAGMA journal_mode=WAL")
+        writer.execute("PRAGMA wal_autocheckpoint=0")
+        writer.execute("INSERT INTO users (name, created_at) VALUES ('waluser', '2026-01-04')")
+        backup_path3 = backup.create_verified_backup(db_path)
+        writer.close()
+        conn = sqlite3.connect(backup_path3)
+        wal_rows = conn.execute("SELECT COUNT(*) FROM users WHERE name = 'waluser'").fetchone()[0]
+        conn.close()
+        report("backup includes WAL pages", wal_rows == 1)
     finally:
         shutil.rmtree(tmp_dir, ignore_errors=True)
 
@@ -307,7 +317,7 @@ def test_safe_migrate_catches_destructive_patch():
     try:
         make_test_db(db_path, schema_version=6)
 
-        live_hash_before = backup.sha256_file(db_path)
+        live_hash_before = _sha256(db_path)
 
         conn = sqlite3.connect(db_path)
         conn.row_factory = sqlite3.Row
@@ -332,7 +342,7 @@ def test_safe_migrate_catches_destructive_patch():
         report("error mentions backup", "backup" in error_msg.lower())
 
         # CRITICAL: Verify the live DB was NOT touched.
-        live_hash_after = backup.sha256_file(db_path)
+        live_hash_after = _sha256(db_path)
         report("live DB unchanged (hash match)", live_hash_before == live_hash_after)
 
         # Double-check: row counts in live DB are still intact.
@@ -353,8 +363,10 @@ def test_safe_migrate_catches_destructive_patch():
         report("backup file exists", len(backups) == 1)
 
         if backups:
-            backup_hash = backup.sha256_file(backups[0])
-            report("backup matches original", backup_hash == live_hash_before)
+            conn = sqlite3.connect(backups[0])
+            backup_counts = backup.table_row_counts(conn)
+            conn.close()
+            report("backup matches original", backup_counts == counts_after)
 
     finally:
         shutil.rmtree(tmp_dir, ignore_errors=True)
@@ -381,7 +393,7 @@ def test_safe_migrate_catches_sql_error():
 
     try:
         make_test_db(db_path, schema_version=6)
-        live_hash_before = backup.sha256_file(db_path)
+        live_hash_before = _sha256(db_path)
 
         aborted = False
         error_msg = ""
@@ -394,7 +406,7 @@ def test_safe_migrate_catches_sql_error():
         report("migration aborted on SQL error", aborted)
 
         # Live DB must be untouched.
-        live_hash_after = backup.sha256_file(db_path)
+        live_hash_after = _sha256(db_path)
         report("live DB unchanged after SQL error", live_hash_before == live_hash_after)
 
         # Backup should still exist.
@@ -463,6 +475,74 @@ def test_safe_migrate_nondestructive():
         shutil.rmtree(tmp_dir, ignore_errors=True)
 
 
+def test_apply_patches_is_atomic():
+    """Test that a failing patch rolls back every patch applied before it."""
+    print("\n== _apply_patches_to atomicity ==")
+
+    tmp_dir = Path(tempfile.mkdtemp())
+    db_path = tmp_dir / "plan.db"
+    patches_dir = tmp_dir / "patches"
+    patches_dir.mkdir()
+    (patches_dir / "patch-2.sql").write_text("ALTER TABLE contexts ADD COLUMN extra_field TEXT;\n")
+    (patches_dir / "patch-3.sql").write_text("SELECT * FROM completely_fake_table;\n")
+
+    try:
+        make_test_db(db_path, schema_version=1)
+        conn = sqlite3.connect(db_path, isolation_level=None)
+        raised = False
+        try:
+            backup._apply_patches_to(conn, 1, backup._load_patches(patches_dir, 1, 3))
+        except sqlite3.Error:
+            raised = True
+        cols = {row[1] for row in conn.execute("PRAGMA table_info(contexts)").fetchall()}
+        version = conn.execute("SELECT version FROM schema_version WHERE id = 1").fetchone()[0]
+        fk_on = conn.execute("PRAGMA foreign_keys").fetchone()[0]
+        conn.close()
+
+        report("failing patch raises", raised)
+        report("earlier patch rolled back", "extra_field" not in cols)
+        report("version unchanged", version == 1)
+        report("foreign keys re-enabled", fk_on == 1)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def test_open_trial_copy():
+    """Test that the trial copy is in memory for small DBs, on disk otherwise."""
+    print("\n== _open_trial_copy ==")
+
+    tmp_dir = Path(tempfile.mkdtemp())
+    db_path = tmp_dir / "plan.db"
+    original_limit = backup._IN_MEMORY_TRIAL_MAX_BYTES
+
+    try:
+        make_test_db(db_path)
+        expected = backup._snapshot_row_counts(db_path)
+
+        conn, tmp_path = backup._open_trial_copy(db_path)
+        try:
+            counts = backup.table_row_counts(conn)
+            db_file = conn.execute("PRAGMA database_list").fetchone()[2]
+        finally:
+            conn.close()
+        report("small DB cloned in memory", tmp_path is None and db_file == "")
+        report("in-memory clone has all rows", counts == expected)
+
+        backup._IN_MEMORY_TRIAL_MAX_BYTES = 0
+        conn, tmp_path = backup._open_trial_copy(db_path)
+        try:
+            counts = backup.table_row_counts(conn)
+        finally:
+            conn.close()
+        report("large DB copied to a temp file", tmp_path is not None and tmp_path.exists())
+        report("temp copy has all rows", counts == expected)
+        if tmp_path is not None:
+            tmp_path.unlink(missing_ok=True)
+    finally:
+        backup._IN_MEMORY_TRIAL_MAX_BYTES = original_limit
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
 def test_backup_missing_db():
     """Test that backup fails gracefully for missing DB."""
     print("\n== Edge: missing DB ==")
@@ -529,10 +609,12 @@ def test_prune_old_backups():
         today_date = today.strftime("%y%m%d")
 
         old_file = backup_dir / f"plan.db.{old_date}a"
+        old_overflow = backup_dir / f"plan.db.{old_date}-17f3a9c2b1d"
         recent_file = backup_dir / f"plan.db.{recent_date}a"
         today_file = backup_dir / f"plan.db.{today_date}a"
 
         old_file.write_text("old")
+        old_overflow.write_text("old overflow")
         recent_file.write_text("recent")
         today_file.write_text("today")
 
@@ -541,21 +623,39 @@ def test_prune_old_backups():
         report("old file removed", not old_file.exists())
         report("recent file kept", recent_file.exists())
         report("today file kept", today_file.exists())
-        report("only one deleted", len(deleted) == 1)
+        report("old overflow backup removed", not old_overflow.exists())
+        report("only old backups deleted", len(deleted) == 2)
     finally:
         shutil.rmtree(tmp_dir, ignore_errors=True)
 
 
-def test_ensure_schema_integration():
-    """Test that db.py's ensure_schema uses the safety pipeline.
+def test_backup_slot_overflow():
+    """Test that a 27th backup on one day gets a timestamp suffix."""
+    print("\n== Backup slot overflow ==")
+    tmp_dir = Path(tempfile.mkdtemp())
+    db_path = tmp_dir / "plan.db"
+    try:
+        make_test_db(db_path)
+        backup_dir = tmp_dir / ".backups"
+        backup_dir.mkdir()
 
-    Creates a pre-patch-7 DB and calls ensure_schema — with the fixed
-    (non-destructive) patch-7, migration should SUCCEED and preserve
-    all data.  A verified backup should be created.
-    """
-    print("\n== ensure_schema integration ==")
+        from datetime import datetime
+        import string
 
-    # Import db module.
+        base = f"plan.db.{datetime.now().strftime('%y%m%d')}"
+        for letter in string.ascii_lowercase:
+            (backup_dir / f"{base}{letter}").write_text("taken")
+
+        backup_path = backup.create_verified_backup(db_path)
+        report("overflow backup created", backup_path.exists())
+        report("overflow name uses hex suffix",
+               backup_path.name.startswith(f"{base}-"), backup_path.name)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def _load_db_module():
+    """Import db.py under a fake package so its relative imports resolve."""
     db_spec = importlib.util.spec_from_file_location("db", MODULE_DIR / "db.py")
     db = importlib.util.module_from_spec(db_spec)
 
@@ -564,13 +664,24 @@ def test_ensure_schema_integration():
     import types
     pkg = types.ModuleType("mcpp_plan_test_pkg")
     pkg.__path__ = [str(MODULE_DIR)]
-    import sys
     sys.modules["mcpp_plan_test_pkg"] = pkg
     sys.modules["mcpp_plan_test_pkg.backup"] = backup
 
     # Patch the relative import by modifying db.py's package reference.
     db.__package__ = "mcpp_plan_test_pkg"
     db_spec.loader.exec_module(db)
+    return db
+
+
+def test_ensure_schema_integration():
+    """Test that db.py's ensure_schema uses the safety pipeline.
+
+    Creates a pre-patch-7 DB and calls ensure_schema — with the fixed
+    (non-destructive) patch-7, migration should SUCCEED and preserve
+    all data.  A verified backup should be created.
+    """
+    print("\n== ensure_schema integration ==")
+    db = _load_db_module()
 
     tmp_dir = Path(tempfile.mkdtemp())
     db_path = tmp_dir / "plan.db"
@@ -622,6 +733,52 @@ def test_ensure_schema_integration():
         sys.modules.pop("mcpp_plan_test_pkg.backup", None)
 
 
+def test_goal_plan_backfill_keeps_one_goal():
+    """A ## Goal note on a context that already has a goal must not break ensure_schema."""
+    print("\n== goal/plan backfill with an existing goal ==")
+    db = _load_db_module()
+    tmp_dir = Path(tempfile.mkdtemp())
+    db_path = tmp_dir / "plan.db"
+    try:
+        conn = db.connect(db_path)
+        db.ensure_schema(conn)
+        now = db.utc_now_iso()
+        cid = conn.execute(
+            "INSERT INTO contexts (name, status, created_at, updated_at) VALUES ('t', 'active', ?, ?)",
+            (now, now),
+        ).lastrowid
+        conn.executemany(
+            "INSERT INTO context_notes (context_id, note_md, created_at, kind) VALUES (?, ?, ?, ?)",
+            [(cid, "old goal", now, "goal"),
+             (cid, "(migrated — no plan defined)", now, "plan"),
+             (cid, "## Goal\nnew goal\n## Plan\nnew plan", now, "note")],
+        )
+        conn.close()
+
+        error_msg = ""
+        for _ in range(2):  # the second run must be a no-op
+            conn = db.connect(db_path)
+            try:
+                db.ensure_schema(conn)
+            except sqlite3.Error as exc:
+                error_msg = str(exc)
+            finally:
+                conn.close()
+        report("ensure_schema succeeded", error_msg == "", error_msg)
+
+        conn = sqlite3.connect(db_path)
+        rows = conn.execute(
+            "SELECT kind, note_md FROM context_notes WHERE kind IN ('goal', 'plan') ORDER BY kind"
+        ).fetchall()
+        conn.close()
+        report("one goal and one plan from the note",
+               rows == [("goal", "new goal"), ("plan", "new plan")], str(rows))
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        sys.modules.pop("mcpp_plan_test_pkg", None)
+        sys.modules.pop("mcpp_plan_test_pkg.backup", None)
+
+
 # ═══════════════════════════════════════════════════════════════
 # Runner
 # ═══════════════════════════════════════════════════════════════
@@ -630,18 +787,21 @@ def main():
     print("backup.py safety pipeline tests")
     print(f"Module: {MODULE_DIR}")
 
-    test_sha256_file()
     test_table_row_counts()
     test_create_verified_backup()
     test_validate_row_counts_catches_loss()
     test_safe_migrate_catches_destructive_patch()
     test_safe_migrate_catches_sql_error()
     test_safe_migrate_nondestructive()
+    test_apply_patches_is_atomic()
+    test_open_trial_copy()
     test_backup_missing_db()
     test_ensure_daily_backup()
     test_ensure_daily_backup_disabled()
     test_prune_old_backups()
+    test_backup_slot_overflow()
     test_ensure_schema_integration()
+    test_goal_plan_backfill_keeps_one_goal()
 
     print(f"\n{'='*50}")
     print(f"RESULTS: {passed} passed, {failed} failed, {passed + failed} total")
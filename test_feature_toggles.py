@@ -65,8 +65,8 @@ def _load_config():
     return mod
 
 
-def _call(tool: str, args: dict | None = None):
-    """Call an MCP tool via execute() with fresh module state."""
+def _fresh_tool_module():
+    """Load mcpptool.py with fresh module state."""
     for k in [k for k in sys.modules if k.startswith("mcpp_plan") or k == "_plan_config_rx"]:
         del sys.modules[k]
     spec = importlib.util.spec_from_file_location(
@@ -75,6 +75,12 @@ def _call(tool: str, args: dict | None = None):
     )
     mod = importlib.util.module_from_spec(spec)
     spec.loader.exec_module(mod)  # type: ignore[union-attr]
+    return mod
+
+
+def _call(tool: str, args: dict | None = None):
+    """Call an MCP tool via execute() with fresh module state."""
+    mod = _fresh_tool_module()
     return mod.execute(tool, args or {}, {"workspace_dir": str(MODULE_DIR)})
 
 
@@ -237,6 +243,53 @@ def test_project_set_no_gate_when_unconfigured():
     report("project_set: allowed when web.key not configured", r.get("success") is True, r.get("error", ""))
 
 
+# ══════════════════════════════════════════════════════════
+# INTEGRATION — config show
+# ══════════════════════════════════════════════════════════
+
+def test_config_show_defaults_unmarked():
+    _write_config()
+    r = _call("plan_config_show")
+    report("config_show succeeds", r.get("success") is True, r.get("error", ""))
+    display = r.get("display", "")
+    marked = [line.strip() for line in display.splitlines() if "(default:" in line]
+    report("config_show: no default suffix for unchanged keys", not marked, f"marked: {marked}")
+
+
+def test_config_show_override_marked():
+    _write_config(enable_steps=False)
+    r = _call("plan_config_show")
+    marked = [line.strip() for line in r.get("display", "").splitlines() if "(default:" in line]
+    report("config_show: only the overridden key is marked",
+           marked == ["- **enable_steps**: `False` (default: True)"], f"marked: {marked}")
+
+
+def test_config_parsed_once_per_process():
+    _write_config()
+    mod = _fresh_tool_module()
+    cfg_mod = mod._load_config_mod()
+    parses = []
+    real_load = cfg_mod._load_config
+
+    def counting_load(path):
+        parses.append(path)
+        return real_load(path)
+
+    cfg_mod._load_config = counting_load
+    ctx = {"workspace_dir": str(MODULE_DIR)}
+    r1 = mod.execute("plan_config_show", {}, ctx)
+    r2 = mod.execute("plan_config_show", {}, ctx)
+    report("config: back-to-back dispatches succeed",
+           r1.get("success") is True and r2.get("success") is True, r1.get("error", r2.get("error", "")))
+    report("config: config.yaml parsed once for two dispatches", len(parses) == 1, f"parses={len(parses)}")
+    report("config: package shares the config module",
+           sys.modules.get("mcpp_plan.config") is cfg_mod)
+
+    cfg_mod.get_config.cache_clear()
+    mod.execute("plan_config_show", {}, ctx)
+    report("config: cache_clear forces one re-parse", len(parses) == 2, f"parses={len(parses)}")
+
+
 # ══════════════════════════════════════════════════════════
 # INTEGRATION — TX filter
 # ══════════════════════════════════════════════════════════
@@ -360,6 +413,11 @@ if __name__ == "__main__":
         test_project_set_key_gate()
         test_project_set_no_gate_when_unconfigured()
 
+        print("\n-- Integration: Config show --")
+        test_config_show_defaults_unmarked()
+        test_config_show_override_marked()
+        test_config_parsed_once_per_process()
+
         print("\n-- Integration: Setup test task --")
         _setup_test_task()
         report("test task created", True)
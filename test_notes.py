@@ -3,7 +3,8 @@
 
 Proves that:
 1. Context notes upsert by kind (goal/plan replace existing, note appends).
-2. Task notes upsert by optional ID (update when ID given, insert when not).
+2. Task notes upsert by optional ID (update when ID given, insert when not),
+   and bulk inserts add every note in one transaction.
 3. Delete works at both context and task note levels.
 4. Note IDs are returned in list output.
 5. Step notes inherit upsert/delete from task notes.
@@ -214,6 +215,12 @@ def test_task_note_upsert_by_id():
         notes = ctx_mod.list_task_notes(conn, user_id=1, project_id=1)
         report("still one note", len(notes) == 1, f"count={len(notes)}")
         report("text updated", notes[0]["note"] == "Updated")
+
+        try:
+            ctx_mod.add_task_note(conn, "Ghost", user_id=1, project_id=1, note_id=id1 + 100)
+            report("unknown id raises", False, "no exception")
+        except ValueError:
+            report("unknown id raises", True)
     finally:
         conn.close()
         cleanup(tmp)
@@ -233,6 +240,39 @@ def test_task_note_append_without_id():
         cleanup(tmp)
 
 
+def test_task_notes_bulk():
+    """Bulk insert adds every note in order with one changelog row each."""
+    print("\n== Task notes bulk insert ==")
+    conn, tmp = make_test_db()
+    try:
+        ids = ctx_mod.add_task_notes_bulk(conn, [
+            {"note_md": "First"},
+            {"note_md": "Second", "task_number": 1},
+        ], user_id=1, project_id=1)
+        report("returns two ids", len(ids) == 2 and ids[0] < ids[1], f"ids={ids}")
+
+        notes = ctx_mod.list_task_notes(conn, user_id=1, project_id=1)
+        report("ids match listed notes", [n["id"] for n in notes] == ids)
+        report("texts in order", [n["note"] for n in notes] == ["First", "Second"])
+
+        logs = conn.execute(
+            "SELECT COUNT(*) FROM changelog WHERE action = 'Task Note Added'"
+        ).fetchone()[0]
+        report("one changelog row per note", logs == 2, f"count={logs}")
+
+        try:
+            ctx_mod.add_task_notes_bulk(conn, [
+                {"note_md": "ok"}, {"note_md": "bad", "task_number": 99},
+            ], user_id=1, project_id=1)
+            report("raises on missing task", False, "no exception raised")
+        except ValueError:
+            after = ctx_mod.list_task_notes(conn, user_id=1, project_id=1)
+            report("raises on missing task", len(after) == 2, f"count={len(after)}")
+    finally:
+        conn.close()
+        cleanup(tmp)
+
+
 def test_task_note_delete():
     """Deleting a task note removes it."""
     print("\n== Task note delete ==")
@@ -431,6 +471,7 @@ if __name__ == "__main__":
     test_task_note_insert()
     test_task_note_upsert_by_id()
     test_task_note_append_without_id()
+    test_task_notes_bulk()
     test_task_note_delete()
     test_step_note_upsert()
     test_step_note_delete()
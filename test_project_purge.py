@@ -9,6 +9,7 @@ Proves that:
 5. Purge by name works (and rejects ambiguous names).
 6. Purge by project_id works.
 7. Purging an orphaned (non-CWD) project works.
+8. Purge clears cached context-name lookups on the connection.
 
 Usage:
     python test_project_purge.py
@@ -266,6 +267,68 @@ def test_user_prefs_cleared():
         shutil.rmtree(tmp, ignore_errors=True)
 
 
+def test_resolve_cache_cleared():
+    print("\n== Cached context lookups cleared by purge ==")
+    tmp = tempfile.mkdtemp()
+    conn = db_mod.connect(Path(tmp) / "test_plan.db")
+    try:
+        conn.executescript((MODULE_DIR / "schema.sql").read_text())
+        pid = seed_project(conn)
+        uid = seed_user(conn)
+        seed_context(conn, pid, uid, name="cached-task")
+        cid = ctx_mod.resolve_context_id(conn, "cached-task", project_id=pid)
+        report("lookup cached on connection",
+               conn.context_ids.get(("cached-task", pid)) == cid)
+        ctx_mod.purge_project(conn, pid, force=True)
+        try:
+            ctx_mod.resolve_context_id(conn, "cached-task", project_id=pid)
+            report("purged context no longer resolves", False)
+        except ValueError:
+            report("purged context no longer resolves", True)
+    finally:
+        conn.close()
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def test_resolve_cache_int_and_str_refs():
+    print("\n== Cached context lookups keep int and str refs apart ==")
+    tmp = tempfile.mkdtemp()
+    conn = db_mod.connect(Path(tmp) / "test_plan.db")
+    try:
+        conn.executescript((MODULE_DIR / "schema.sql").read_text())
+        pid = seed_project(conn)
+        uid = seed_user(conn)
+        cid = seed_context(conn, pid, uid, name="2024")
+        report("digit name resolves by name", ctx_mod.resolve_context_id(conn, "2024") == cid)
+        try:
+            ctx_mod.resolve_context_id(conn, 2024)
+            report("int ref does not reuse the name hit", False)
+        except ValueError:
+            report("int ref does not reuse the name hit", True)
+    finally:
+        conn.close()
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def test_set_project_ids_stay_dense():
+    print("\n== set_project on an existing path keeps project ids dense ==")
+    tmp = tempfile.mkdtemp()
+    conn = db_mod.connect(Path(tmp) / "test_plan.db")
+    try:
+        conn.executescript((MODULE_DIR / "schema.sql").read_text())
+        first = ctx_mod.set_project(conn, project_name="one", absolute_path="/tmp/one")
+        again = ctx_mod.set_project(conn, absolute_path="/tmp/one", description_md="updated")
+        report("existing path updated in place",
+               again["id"] == first["id"] and again["description_md"] == "updated"
+               and again["project_name"] == "one")
+        second = ctx_mod.set_project(conn, project_name="two", absolute_path="/tmp/two")
+        report("next project id follows on", second["id"] == first["id"] + 1,
+               f"first={first['id']} second={second['id']}")
+    finally:
+        conn.close()
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
 def test_end_to_end_via_execute():
     print("\n== End-to-end via execute() ==")
     import mcpptool as mcp
@@ -289,6 +352,9 @@ if __name__ == "__main__":
     test_purge_by_name()
     test_not_found()
     test_user_prefs_cleared()
+    test_resolve_cache_cleared()
+    test_resolve_cache_int_and_str_refs()
+    test_set_project_ids_stay_dense()
     test_end_to_end_via_execute()
 
     print(f"\n{'='*40}")
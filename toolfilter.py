@@ -10,12 +10,19 @@ import importlib.util
 from pathlib import Path
 
 
+_config_mod = None
+
+
 def excluded_tools() -> frozenset[str]:
     """Return tool names to exclude based on current config."""
-    cfg_path = Path(__file__).resolve().parent / "config.py"
-    spec = importlib.util.spec_from_file_location("_plan_config", str(cfg_path))
-    if not spec or not spec.loader:
-        return frozenset()
-    mod = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(mod)  # type: ignore[union-attr]
-    return mod.disabled_tools() | mod.WEB_ONLY_TOOLS
+    global _config_mod
+    if _config_mod is None:
+        # Loaded once; its get_config() notices config.yaml edits itself.
+        cfg_path = Path(__file__).resolve().parent / "config.py"
+        spec = importlib.util.spec_from_file_location("_plan_config", str(cfg_path))
+        if not spec or not spec.loader:
+            return frozenset()
+        mod = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(mod)  # type: ignore[union-attr]
+        _config_mod = mod
+    return _config_mod.disabled_tools() | _config_mod.WEB_ONLY_TOOLS